@@ -0,0 +1,152 @@
+"""
+JSON API for scoreboards, the club website and pitch-side scorer apps.
+
+Serves the same data as the Streamlit dashboard without a browser session:
+    GET /api/schedule   full schedule with resolved knockout teams
+    GET /api/scores     every match with its score (null while unplayed)
+    GET /api/standings  group tables
+    GET /api/brackets   knockout brackets, once the group stage is complete
+    POST /api/scores    submit a batch of results (admin HTTP Basic auth); the body is
+                        JSON or CSV as in the admin panel's batch import. Every row is
+                        validated first and the batch is written all-or-nothing.
+
+Add ?tournament=<id> to pick one of the registered tournaments (default: the first);
+GET /api lists them. Responses are rebuilt only when that tournament's data changes
+and carry an ETag, so pollers sending If-None-Match get an empty 304 until a score is
+entered. The most recently used MAX_CACHED_TOURNAMENTS tournaments stay cached.
+Endpoints do blocking file/database reads, so they run in Starlette's threadpool
+rather than on the event loop.
+
+Run alongside the app with:  uvicorn api:app --port 8502
+"""
+import base64
+import binascii
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+import app as tournament
+
+_cache = OrderedDict()  # tournament id -> (signature, payloads), least recently used first
+_cache_lock = threading.Lock()
+
+
+def _records(df):
+    """DataFrame rows as JSON-ready dicts (NaN/NA become null)."""
+    return json.loads(df.to_json(orient="records"))
+
+
+def build_documents():
+    """The schedule, scores, standings and brackets documents of the active tournament (also used by snapshot.py)."""
+    state = tournament.load_tournament_state()
+    full_schedule, scores, group_stage_complete = state["schedule"], state["scores"], state["group_stage_complete"]
+    merged_scores = pd.merge(full_schedule[["match", "teams"]], scores, on="match", how="left")
+    return {
+        "schedule": {"group_stage_complete": group_stage_complete, "matches": _records(full_schedule)},
+        "scores": {"matches": _records(merged_scores)},
+        "standings": {
+            group: [{"team": tournament.team_dict.get(code, code), "code": code, **stats} for code, stats in ranking]
+            for group, ranking in state["standings"].items()
+        },
+        "brackets": tournament.partition_brackets(full_schedule, scores) if group_stage_complete else {},
+    }
+
+
+def _build_payloads():
+    payloads = {}
+    for name, document in build_documents().items():
+        body = json.dumps(document, separators=(",", ":")).encode()
+        payloads[name] = (body, f'"{hashlib.sha1(body).hexdigest()}"')
+    return payloads
+
+
+def _payload(name, tournament_id=None):
+    """Serialized document and ETag for ``name``, rebuilt only when the tournament's data signature changes."""
+    with _cache_lock:
+        tournament.use_tournament(tournament_id)
+        signature = tournament.tournament_signature()
+        cached = _cache.get(tournament.TOURNAMENT_ID)
+        if cached is None or cached[0] != signature:
+            cached = _cache[tournament.TOURNAMENT_ID] = signature, _build_payloads()
+        _cache.move_to_end(tournament.TOURNAMENT_ID)
+        while len(_cache) > tournament.MAX_CACHED_TOURNAMENTS:
+            _cache.popitem(last=False)
+        return cached[1][name]
+
+
+def _endpoint(name):
+    def endpoint(request):
+        try:
+            body, etag = _payload(name, request.query_params.get("tournament"))
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, status_code=404)
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Access-Control-Allow-Origin": "*"}
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type="application/json", headers=headers)
+    return endpoint
+
+
+def _authorized(request):
+    scheme, _, credentials = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "basic":
+        return None
+    try:
+        username, _, password = base64.b64decode(credentials).decode().partition(":")
+    except (binascii.Error, UnicodeDecodeError):
+        return None
+    return username if tournament.check_login(username, password) else None
+
+
+async def submit_scores(request):
+    """Validate and apply a batch of results in one write."""
+    body = await request.body()  # the only step that needs the event loop
+    return await run_in_threadpool(_submit_scores, request, body)
+
+
+def _submit_scores(request, body):
+    author = _authorized(request)
+    if author is None:
+        return JSONResponse({"error": "admin credentials required"}, status_code=401,
+                            headers={"WWW-Authenticate": 'Basic realm="rhl"'})
+    with _cache_lock:
+        try:
+            tournament.use_tournament(request.query_params.get("tournament"))
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, status_code=404)
+        try:
+            rows = tournament.parse_score_batch(body.decode("utf-8-sig"))
+        except ValueError as e:
+            return JSONResponse({"error": f"could not read the results: {e}"}, status_code=400)
+        items, errors = tournament.validate_score_batch(rows, tournament.load_tournament_state()["schedule"])
+        if errors or not items:
+            return JSONResponse({"errors": errors or ["no results in the request"]}, status_code=400)
+        tournament.update_scores(items, author=author)
+    return JSONResponse({"updated": [{"match": match, "score": score} for match, score in items]})
+
+
+def index(request):
+    return JSONResponse({
+        "endpoints": [f"/api/{name}" for name in ("schedule", "scores", "standings", "brackets")],
+        "tournaments": list(tournament.tournament_registry()),
+    })
+
+
+app = Starlette(routes=[
+    Route("/api", index),
+    Route("/api/scores", submit_scores, methods=["POST"]),
+    *(Route(f"/api/{name}", _endpoint(name)) for name in ("schedule", "scores", "standings", "brackets")),
+])
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="0.0.0.0", port=8502)
@@ -1,362 +1,1246 @@
 ﻿import streamlit as st
-import pandas as pd
 import os
-from datetime import datetime, timedelta
-from collections import defaultdict
+import csv
+import io
+import json
+import hashlib
+import heapq
+import functools
+import importlib
+import threading
+import time
+from collections import defaultdict, deque
+
+from model import Result, Roster, TeamRecord, parse_score, split_sides
+from profiling import profiler, timings
+from signatures import file_signature
+from tiebreakers import DEFAULT_TIEBREAKERS, PairwiseResults, Tiebreakers, seeded_order, validate_tiebreakers
+
+
+class _LazyModule:
+    """Stand-in for a module that is imported on first attribute access."""
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(importlib.import_module(self._name), attr)
+
+
+# pandas and numpy take ~0.3 s to import; the login page needs neither, so a new
+# process only pays for them once a session actually loads tournament data.
+pd = _LazyModule("pandas")
+np = _LazyModule("numpy")
 
 # --------------------
 # FILE PATHS & CREDENTIALS
 # --------------------
-GROUP_SCHEDULE_FILE = "group_schedule.csv"
-SCORES_FILE = "scores.csv"
+# Data file names inside a tournament's directory. GROUP_SCHEDULE_FILE, SCORES_FILE,
+# SCORES_DB_FILE and SCORE_LOG_FILE are the active tournament's paths (see use_tournament).
+GROUP_SCHEDULE_NAME = "group_schedule.csv"
+SCORES_NAME = "scores.csv"
+SCORES_DB_NAME = os.environ.get("RHL_SCORES_DB", "scores.db")
+SCORE_LOG_NAME = os.environ.get("RHL_SCORE_LOG", "score_events.jsonl")
+TOURNAMENTS_DIR = os.environ.get("RHL_TOURNAMENTS_DIR", "tournaments")
+MAX_CACHED_TOURNAMENTS = int(os.environ.get("RHL_MAX_CACHED_TOURNAMENTS", "16"))
+SCORE_BACKEND = os.environ.get("RHL_SCORE_BACKEND", "csv")  # "csv", "sqlite" or "eventlog"
+LIVE_REFRESH_SECONDS = int(os.environ.get("RHL_LIVE_REFRESH_SECONDS", "10"))
+ODDS_SIMULATIONS = int(os.environ.get("RHL_ODDS_SIMULATIONS", "20000"))
 ADMIN_USERNAME = "admin"
 ADMIN_PASSWORD = "rhl2025"
 
 # --------------------
-# TEAM DATA
+# TOURNAMENT CONFIG
+# --------------------
+TOURNAMENT_CONFIG_FILE = "tournament.json"
+
+# "seeding": "groups" pairs qualifiers by group (see bracket_seed_slots); "ranked" ranks them
+# across groups with the tiebreakers and pairs best with worst (see bracket_seeds); with a
+# "count" it only takes that many of them, e.g. the best 4 of 6 third-placed teams.
+# "round_prefix" defaults to "" for the first bracket and "<name> " for the others.
+BRACKET_DEFAULTS = {"positions": [1], "first_match": None, "start_offset_minutes": 3, "seeding": "groups",
+                    "count": None}
+
+def load_tournament_config(file):
+    """Read the tournament config (teams, timings, brackets) and fill in defaults."""
+    with open(file, encoding="utf-8") as f:
+        config = json.load(f)
+    config.setdefault("start_time", "08:00:00")
+    config.setdefault("match_minutes", 12)
+    config.setdefault("final_minutes", config["match_minutes"])
+    config.setdefault("gap_minutes", 3)
+    config.setdefault("rest_minutes", config["gap_minutes"])
+    config.setdefault("pitches", 1)
+    config["tiebreakers"] = validate_tiebreakers(config.get("tiebreakers", DEFAULT_TIEBREAKERS))
+    config.setdefault("lots_seed", 0)
+    brackets = []
+    for i, bracket in enumerate(config.get("brackets", [])):
+        bracket = {**BRACKET_DEFAULTS, "round_prefix": f"{bracket['name']} " if i else "", **bracket}
+        if bracket["seeding"] not in ("groups", "ranked"):
+            raise ValueError(f"{bracket['name']} bracket: unknown seeding {bracket['seeding']!r}; expected 'groups' or 'ranked'")
+        if bracket["count"] is not None and bracket["seeding"] != "ranked":
+            raise ValueError(f"{bracket['name']} bracket: a count needs \"seeding\": \"ranked\"")
+        bracket.setdefault("final", f"{bracket['name']} Final")
+        bracket.setdefault("third_place", f"{bracket['name']} 3rd Place")
+        brackets.append(bracket)
+    config["brackets"] = brackets
+    group_sizes = defaultdict(int)
+    for t in config["teams"]:
+        group_sizes[t["group"]] += 1
+    for bracket in brackets:
+        # Checked here rather than when the group stage ends and the bracket is drawn
+        if any(not 1 <= pos <= min(group_sizes.values(), default=0) for pos in bracket["positions"]):
+            raise ValueError(f"{bracket['name']} bracket: positions {bracket['positions']} do not exist in every group")
+        qualifiers = len(group_sizes) * len(bracket["positions"])
+        if bracket["count"] is not None and bracket["count"] > qualifiers:
+            raise ValueError(f"{bracket['name']} bracket: count {bracket['count']} is more than the {qualifiers} "
+                             f"teams in positions {bracket['positions']}")
+        size = bracket_size(bracket, config)
+        if size < 2 or size & (size - 1):
+            source = (f"count {size}" if bracket["count"] is not None else
+                      f"{len(group_sizes)} groups x {len(bracket['positions'])} positions gives {size} teams")
+            raise ValueError(f"{bracket['name']} bracket: {source}; a knockout bracket needs a power of two "
+                             f"(2, 4, 8, ...), e.g. a \"ranked\" bracket with a count")
+    # "Winner SF1" placeholders and the round -> bracket lookup need every round name to be unique
+    seen = set()
+    for bracket in brackets:
+        for name in bracket_round_names(bracket, config):
+            if name.lower() in seen:
+                raise ValueError(f"{bracket['name']} bracket: round {name!r} is already used by another bracket; "
+                                 f"give it a different round_prefix")
+            seen.add(name.lower())
+    return config
+
+# --------------------
+# TOURNAMENT REGISTRY
 # --------------------
-teams = [
-    {"name": "Royal Lions", "group": "A", "code": "A1"},
-    {"name": "Royal Tuskers", "group": "A", "code": "A2"},
-    {"name": "Royal Panthers", "group": "A", "code": "A3"},
-    {"name": "Royal Sharks", "group": "B", "code": "B1"},
-    {"name": "Royal Tigers", "group": "B", "code": "B2"},
-    {"name": "Royal Leopards", "group": "B", "code": "B3"},
-    {"name": "Royal Cheetahs", "group": "C", "code": "C1"},
-    {"name": "Royal Bulls", "group": "C", "code": "C2"},
-    {"name": "Royal Zebras", "group": "C", "code": "C3"},
-    {"name": "Royal Eagles", "group": "D", "code": "D1"},
-    {"name": "Royal Rhinos", "group": "D", "code": "D2"},
-    {"name": "Royal Wolves", "group": "D", "code": "D3"}
-]
-team_dict = {t["code"]: t["name"] for t in teams}
+MAIN_TOURNAMENT = "main"
 
+def tournament_registry():
+    """
+    Tournament id -> data directory. The event in the working directory is "main"; every
+    sub-directory of TOURNAMENTS_DIR holding a tournament.json is another, named after it.
+    """
+    registry = {}
+    if os.path.exists(TOURNAMENT_CONFIG_FILE):
+        registry[MAIN_TOURNAMENT] = ""
+    try:
+        names = sorted(os.listdir(TOURNAMENTS_DIR))
+    except FileNotFoundError:
+        names = []
+    for name in names:
+        directory = os.path.join(TOURNAMENTS_DIR, name)
+        if os.path.isfile(os.path.join(directory, TOURNAMENT_CONFIG_FILE)):
+            registry[name] = directory
+    return registry
+
+@st.cache_resource(show_spinner=False, max_entries=MAX_CACHED_TOURNAMENTS)
+def _cached_tournament(file, signature):
+    config = load_tournament_config(file)
+    return config, Roster(config["teams"])
+
+def use_tournament(tournament_id=None):
+    """
+    Point the config, team lookups and data file paths at one registered tournament
+    (the first one by default). Streamlit executes this script in a fresh module on
+    every rerun, so within the app this only affects the calling rerun.
+    """
+    global TOURNAMENT_ID, TOURNAMENT_KEY, GROUP_SCHEDULE_FILE, SCORES_FILE, SCORES_DB_FILE, SCORE_LOG_FILE
+    global tournament_config, roster, teams, team_dict, bracket_rounds
+    registry = tournament_registry()
+    if not registry:
+        raise FileNotFoundError(f"No {TOURNAMENT_CONFIG_FILE} in the working directory or under {TOURNAMENTS_DIR}/")
+    tournament_id = next(iter(registry)) if tournament_id is None else tournament_id
+    if tournament_id not in registry:
+        raise ValueError(f"Unknown tournament {tournament_id!r}; expected one of {', '.join(registry)}")
+    directory = registry[tournament_id]
+    TOURNAMENT_ID = tournament_id
+    TOURNAMENT_KEY = os.path.abspath(directory or ".")  # identifies the tournament in process-wide caches
+    GROUP_SCHEDULE_FILE = os.path.join(directory, GROUP_SCHEDULE_NAME)
+    SCORES_FILE = os.path.join(directory, SCORES_NAME)
+    SCORES_DB_FILE = os.path.join(directory, SCORES_DB_NAME)
+    SCORE_LOG_FILE = os.path.join(directory, SCORE_LOG_NAME)
+    config_file = os.path.join(directory, TOURNAMENT_CONFIG_FILE)
+    tournament_config, roster = _cached_tournament(config_file, file_signature(config_file))
+    teams = tournament_config["teams"]
+    team_dict = roster.names
+    bracket_rounds = _bracket_rounds()
+
+# --------------------
+# TEAM DATA
+# --------------------
 # Mapping for resolving knockout placeholders (if needed)
 knockout_map = {
     "QF1": "Quarterfinal 1", "QF2": "Quarterfinal 2",
     "QF3": "Quarterfinal 3", "QF4": "Quarterfinal 4",
     "SF1": "Semifinal 1",  "SF2": "Semifinal 2"
 }
+round_refs = {name: ref for ref, name in knockout_map.items()}
 
 # --------------------
 # HELPER FUNCTIONS
 # --------------------
-def load_csv(file, columns):
-    if os.path.exists(file):
-        return pd.read_csv(file)
-    else:
-        df = pd.DataFrame(columns=columns)
-        df.to_csv(file, index=False)
-        return df
+@timings.timed("load_group_schedule (CSV)")
+def load_group_schedule():
+    """Load the group schedule, generating it from the tournament config the first time."""
+    if not os.path.exists(GROUP_SCHEDULE_FILE):
+        from score_store import atomic_write_csv
+        atomic_write_csv(generate_group_schedule(), GROUP_SCHEDULE_FILE)
+    return pd.read_csv(GROUP_SCHEDULE_FILE)
 
 def replace_codes_with_names(teams_str):
-    for code, name in team_dict.items():
-        teams_str = teams_str.replace(code, name)
-    return teams_str
+    """Team names for the codes in a "t1 vs t2" string; placeholders and names pass through."""
+    return roster.display(teams_str)
+
+def centered_columns(df):
+    """column_config centring every column; cheaper to send than a Styler, which ships per-cell CSS."""
+    return {column: st.column_config.Column(alignment="center") for column in df.columns}
 
 def check_login(username, password):
     return username == ADMIN_USERNAME and password == ADMIN_PASSWORD
 
-def update_score(match, score):
-    scores = load_csv(SCORES_FILE, ["match", "score"])
-    if match in scores["match"].values:
-        scores.loc[scores["match"] == match, "score"] = score
-    else:
-        new_row = pd.DataFrame({"match": [match], "score": [score]})
-        scores = pd.concat([scores, new_row], ignore_index=True)
-    scores.to_csv(SCORES_FILE, index=False)
-
-def calculate_group_standings(group_schedule, scores):
-    standings = {}
-    groups = group_schedule["group"].unique()
-    for group in groups:
-        group_matches = group_schedule[group_schedule["group"] == group]
-        teams_in_group = [t["code"] for t in teams if t["group"] == group]
-        standings[group] = {team: {"points": 0, "wins": 0, "losses": 0, "gf": 0, "ga": 0}
-                             for team in teams_in_group}
-        for _, row in group_matches.iterrows():
-            score_val = scores[scores["match"] == row["match"]]["score"].values
-            if len(score_val) > 0 and pd.notna(score_val[0]):
-                t1, t2 = row["teams"].split(" vs ")
-                try:
-                    s1, s2 = map(int, score_val[0].split("-"))
-                except ValueError:
-                    continue
-                standings[group][t1]["gf"] += s1
-                standings[group][t1]["ga"] += s2
-                standings[group][t2]["gf"] += s2
-                standings[group][t2]["ga"] += s1
-                if s1 > s2:
-                    standings[group][t1]["points"] += 3
-                    standings[group][t1]["wins"] += 1
-                    standings[group][t2]["losses"] += 1
-                elif s2 > s1:
-                    standings[group][t2]["points"] += 3
-                    standings[group][t2]["wins"] += 1
-                    standings[group][t1]["losses"] += 1
+@st.cache_resource(show_spinner=False, max_entries=MAX_CACHED_TOURNAMENTS)
+def _score_store(tournament_key, backend, csv_file, db_file, log_file):
+    from score_store import open_score_store
+    return open_score_store(backend, csv_file, db_file, log_file)
+
+def get_score_store():
+    """The active tournament's score backend, shared by every session."""
+    return _score_store(TOURNAMENT_KEY, SCORE_BACKEND, os.path.abspath(SCORES_FILE),
+                        os.path.abspath(SCORES_DB_FILE), os.path.abspath(SCORE_LOG_FILE))
+
+@timings.timed("load_scores")
+def load_scores():
+    return get_score_store().load()
+
+def update_score(match, score, author=None):
+    update_scores([(match, score)], author)
+
+@timings.timed("update_scores")
+def update_scores(items, author=None):
+    """
+    Write several (match, score) pairs in one atomic store write, then update the shared
+    standings/bracket and invalidate the cached tournament state once for the whole batch.
+    """
+    items = list(items)
+    if not items:
+        return
+    shared = _shared_engines(TOURNAMENT_KEY)
+    with shared["lock"]:
+        before, after = get_score_store().upsert_many(items, author)
+        # Apply the deltas to the shared standings/bracket instead of recomputing them on the next rerun,
+        # unless another writer got in since they were built
+        in_sync = shared["standings"] is not None and shared["signature"] == tournament_signature(before)
+        if in_sync:
+            for match, score in items:
+                shared["standings"].set_score(match, score)
+            if any(match in shared["standings"].fixtures for match, _ in items):
+                shared["bracket"] = None  # a group result can reseed the knockouts
+            elif shared["bracket"] is not None:
+                for match, score in items:
+                    shared["bracket"].set_score(match, score)
+            shared["signature"] = tournament_signature(after)
+    _load_tournament_state.clear()
+    get_score_feed().publish([match for match, _ in items], tournament_signature(after))
+
+# --------------------
+# BATCH SCORE IMPORT
+# --------------------
+def parse_score_batch(text):
+    """
+    Raw (match, score) rows from pasted or uploaded text: JSON (a list of {"match", "score"}
+    objects, or one {match: score} object) or CSV with a "match,score" row per line, header optional.
+    Raises ValueError if the text is neither.
+    """
+    text = text.strip()
+    if text[:1] in ("[", "{"):
+        data = json.loads(text)
+        if isinstance(data, dict):
+            return list(data.items())
+        if not isinstance(data, list):
+            raise ValueError("expected a JSON list or object")
+        return [(row.get("match"), row.get("score")) if isinstance(row, dict) else (row, None) for row in data]
+    rows = [row for row in csv.reader(io.StringIO(text)) if any(cell.strip() for cell in row)]
+    if rows and rows[0][0].strip().lower() == "match":
+        rows = rows[1:]
+    return [(row[0], row[1] if len(row) > 1 else None) for row in rows]
+
+def validate_score_batch(rows, schedule):
+    """
+    Check raw rows against the schedule's match numbers and the "s1-s2" score format.
+    Returns (items, errors): the normalized (match, score) pairs and one message per rejected row.
+    """
+    known = set(schedule["match"].tolist())
+    items, errors = {}, []
+    for line, (match, score) in enumerate(rows, 1):
+        try:
+            match = int(str(match).strip())
+        except ValueError:
+            errors.append(f"Row {line}: {match!r} is not a match number")
+            continue
+        result = parse_score(score.replace(" ", "") if isinstance(score, str) else score)
+        if match not in known:
+            errors.append(f"Row {line}: match {match} is not in the schedule")
+        elif result is None:
+            errors.append(f"Row {line}: {score!r} is not a score like 2-1")
+        elif items.get(match, f"{result.home}-{result.away}") != f"{result.home}-{result.away}":
+            errors.append(f"Row {line}: match {match} is listed twice with different scores")
+        else:
+            items[match] = f"{result.home}-{result.away}"
+    return list(items.items()), errors
+
+def _first_scores(scores):
+    """The score row used for each match (the first one, as in every per-row lookup)."""
+    return scores.drop_duplicates("match", keep="first")
+
+def group_stage_is_complete(group_schedule, scores):
+    """True when every group match has a (non-empty) score."""
+    first = _first_scores(scores)
+    scored = first.loc[first["score"].notna(), "match"]
+    return bool(group_schedule["match"].isin(scored).all())
+
+def _parse_goals(score):
+    """
+    Vectorized parse_score over a Series: two int64 goal arrays plus a validity mask.
+    Each distinct score string is parsed once, so the cost is one hash pass over the column.
+    """
+    codes, uniques = pd.factorize(score)
+    parsed = [parse_score(u) for u in uniques] + [None]  # code -1 (missing) maps to the trailing None
+    s1 = np.array([p[0] if p else 0 for p in parsed], dtype="int64")
+    s2 = np.array([p[1] if p else 0 for p in parsed], dtype="int64")
+    valid = np.array([p is not None for p in parsed], dtype=bool)
+    return s1[codes], s2[codes], valid[codes]
+
+# --------------------
+# STANDINGS ENGINE
+# --------------------
+class StandingsEngine:
+    """
+    Group-stage totals per team id, with fixtures held as Match records.
+    A single result can be added, edited or removed in constant time; only the
+    affected group is re-ranked (with the config's tiebreakers) the next time
+    standings are requested.
+    """
+
+    def __init__(self, group_schedule, team_list=None, config=None):
+        config = tournament_config if config is None else config
+        team_list = config["teams"] if team_list is None else team_list
+        self.roster = roster if team_list is teams else Roster(team_list)
+        self.tiebreakers = Tiebreakers.from_config(config, team_list)
+        self.group_ids = {group: self.roster.groups.get(group, []) for group in group_schedule["group"].unique()}
+        self.groups = {group: [self.roster.teams[i].code for i in ids] for group, ids in self.group_ids.items()}
+        self.records = [TeamRecord() for _ in self.roster.teams]
+        self.fixtures = {}
+        for number, teams_str, group in zip(group_schedule["match"].tolist(), group_schedule["teams"].tolist(),
+                                            group_schedule["group"].tolist()):
+            fixture = self.roster.match(number, teams_str, group)
+            if fixture is not None and fixture.resolved:
+                self.fixtures[number] = fixture
+        self.results = {}
+        self.pairwise = {}
+        self._sorted = {}
+
+    def load(self, scores):
+        """Replace all results with ``scores``, aggregating every team in one vectorized pass."""
+        first = _first_scores(scores)
+        fixtures = list(self.fixtures.values())
+        position = pd.Index([f.number for f in fixtures]).get_indexer(first["match"])
+        s1, s2, valid = _parse_goals(first["score"])
+        played = (position >= 0) & valid
+        position, s1, s2 = position[played], s1[played], s2[played]
+        home = np.array([f.home for f in fixtures], dtype="int64")[position]
+        away = np.array([f.away for f in fixtures], dtype="int64")[position]
+
+        def total(home_value, away_value):
+            n = len(self.records)
+            return (np.bincount(home, home_value, n) + np.bincount(away, away_value, n)).astype("int64").tolist()
+        home_won, away_won, drawn = s1 > s2, s2 > s1, s1 == s2
+        totals = {
+            "points": total(3 * home_won + drawn, 3 * away_won + drawn),
+            "wins": total(home_won, away_won),
+            "losses": total(away_won, home_won),
+            "gf": total(s1, s2),
+            "ga": total(s2, s1),
+        }
+        self.records = [TeamRecord(*values) for values in zip(*(totals[field] for field in TeamRecord.FIELDS))]
+        self.results = {fixtures[i].number: Result(h, a) for i, h, a in zip(position.tolist(), s1.tolist(), s2.tolist())}
+        if self.tiebreakers.head_to_head:
+            self.pairwise = {group: PairwiseResults(ids) for group, ids in self.group_ids.items()}
+            for number, result in self.results.items():
+                fixture = self.fixtures[number]
+                self.pairwise[fixture.stage].apply(fixture.home, fixture.away, result)
+        self._sorted = {}
+        return self
+
+    def set_score(self, match, score):
+        """Add or replace the result of one group match, reversing any previous result."""
+        fixture = self.fixtures.get(match)
+        if fixture is None:
+            return
+        old = self.results.pop(match, None)
+        if old is not None:
+            self._apply(fixture, old, -1)
+        new = parse_score(score)
+        if new is not None:
+            self._apply(fixture, new, 1)
+            self.results[match] = new
+        self._sorted.pop(fixture.stage, None)
+
+    def _apply(self, fixture, result, sign):
+        s1, s2 = result
+        self.records[fixture.home].apply(s1, s2, sign)
+        self.records[fixture.away].apply(s2, s1, sign)
+        if fixture.stage in self.pairwise:
+            self.pairwise[fixture.stage].apply(fixture.home, fixture.away, result, sign)
+
+    def standings(self):
+        """Return ``{group: [(code, stats), ...]}`` ranked by the tiebreakers, best first."""
+        result = {}
+        teams_by_id = self.roster.teams
+        for group, ids in self.group_ids.items():
+            if group not in self._sorted:
+                self._sorted[group] = self.tiebreakers.rank(ids, self.records, self.pairwise.get(group))
+            result[group] = [(teams_by_id[i].code, self.records[i].as_dict()) for i in self._sorted[group]]
+        return result
+
+def rank_across_groups(codes, standings, config=None):
+    """
+    ``codes`` of teams from different groups (e.g. every third-placed team), best first by
+    the config's tiebreakers applied to their group records. Head-to-head does not apply.
+    """
+    config = tournament_config if config is None else config
+    names = roster if config is tournament_config else Roster(config["teams"])
+    stats = {code: team_stats for ranking in standings.values() for code, team_stats in ranking}
+    records = {names.team_id(code): TeamRecord(**stats[code]) for code in codes}
+    return [names.teams[i].code for i in Tiebreakers.from_config(config).rank(list(records), records)]
+
+@timings.timed("calculate_group_standings")
+def calculate_group_standings(group_schedule, scores, team_list=None):
+    return StandingsEngine(group_schedule, team_list).load(scores).standings()
+
+@st.cache_resource(show_spinner=False, max_entries=MAX_CACHED_TOURNAMENTS)
+def _shared_engines(tournament_key):
+    """Process-wide standings engine and bracket graph of a tournament, plus the data signature they are in sync with."""
+    return {"standings": None, "bracket": None, "signature": None, "lock": threading.Lock()}
+
+@timings.timed("standings (incremental)")
+def current_standings(group_schedule, scores, signature):
+    """Standings for the given data version, rebuilding the shared engine only if it is out of sync."""
+    shared = _shared_engines(TOURNAMENT_KEY)
+    with shared["lock"]:
+        if shared["signature"] != signature:
+            shared["standings"] = StandingsEngine(group_schedule).load(scores)
+            shared["bracket"] = None
+            shared["signature"] = signature
+        return shared["standings"].standings()
+
+@timings.timed("bracket resolution (incremental)")
+def current_bracket(full_schedule, scores, signature):
+    """Resolved bracket graph for ``full_schedule``, reusing the shared one while its structure is unchanged."""
+    shared = _shared_engines(TOURNAMENT_KEY)
+    with shared["lock"]:
+        bracket = shared["bracket"]
+        if bracket is None or shared["signature"] != signature or bracket.key != BracketGraph.structure_key(full_schedule):
+            bracket = BracketGraph(full_schedule).load(scores)
+            if shared["signature"] == signature:
+                shared["bracket"] = bracket
+        return bracket
+
+# --------------------
+# SCHEDULE GENERATORS
+# --------------------
+def _seconds(time_str):
+    h, m, sec = map(int, time_str.split(":"))
+    return h * 3600 + m * 60 + sec
+
+def _clock(seconds):
+    h, rest = divmod(int(seconds), 3600)
+    return f"{h:02d}:{rest // 60:02d}:{rest % 60:02d}"
+
+def schedule_matches(fixtures, config=None, team_ready=None):
+    """
+    Assign fixtures to pitches and start times, minimizing when the last match ends.
+
+    ``fixtures`` has match, teams, group plus ``duration`` and ``release`` (earliest start)
+    in seconds. A match starts only after its feeder matches ("Winner/Loser X") have ended
+    and both known teams have had ``rest_minutes``; a pitch needs ``gap_minutes`` between
+    matches. Greedy list scheduling: whenever a pitch frees up it takes the match that can
+    start soonest, preferring the longest remaining dependency chain (critical path); finals
+    go after the matches they could share a slot with whenever the day still ends as early.
+    ``team_ready`` maps team name/code to the second it is next available.
+    Returns the fixtures with start_time, end_time and pitch columns instead of duration/release.
+    """
+    config = tournament_config if config is None else config
+    gap = config["gap_minutes"] * 60
+    rest = max(config["rest_minutes"] * 60, gap)
+    graph = BracketGraph(fixtures)
+    ids = fixtures["match"].tolist()
+    durations = dict(zip(ids, fixtures["duration"].tolist()))
+    release = dict(zip(ids, fixtures["release"].tolist()))
+    feeders = {m: [slot[1] for slot in graph.slots.get(m, ()) if isinstance(slot, tuple)] for m in ids}
+    known = {m: [slot for slot in graph.slots.get(m, ()) if isinstance(slot, str)] for m in ids}
+    tail = {}
+    for m in reversed(graph.order):
+        tail[m] = durations[m] + max((rest + tail[child] for child in graph.children.get(m, ())), default=0)
+    waiting = {m: len(feeders[m]) for m in ids}
+
+    def list_schedule(priority):
+        team_free = dict(team_ready or {})
+        start, end, pitch = {}, {}, {}
+        left = dict(waiting)
+
+        def ready_at(m):
+            """Earliest start of ``m`` on any pitch: released, feeders over and both teams rested."""
+            return max([release[m]] + [end[f] + rest for f in feeders[m]] + [team_free.get(team, 0) for team in known[m]])
+
+        # Two heaps: ``pending`` by earliest start, ``startable`` (can start by ``now``) by priority. Keys
+        # only grow (a team's match pushes its other matches back), so stale entries are re-checked when popped.
+        pending = [(ready_at(m), m) for m in ids if not left[m]]
+        heapq.heapify(pending)
+        startable = []
+        pitch_free = [(0, p) for p in range(1, config["pitches"] + 1)]
+        while pending or startable:
+            free, p = heapq.heappop(pitch_free)
+            best = None
+            while best is None:
+                now = free if startable else max(free, pending[0][0])
+                while pending and pending[0][0] <= now:
+                    at, m = heapq.heappop(pending)
+                    actual = ready_at(m)
+                    if actual > at:
+                        heapq.heappush(pending, (actual, m))
+                    else:
+                        heapq.heappush(startable, (priority[m], m))
+                _, m = heapq.heappop(startable)
+                at = ready_at(m)
+                if at <= now:
+                    best = m
                 else:
-                    standings[group][t1]["points"] += 1
-                    standings[group][t2]["points"] += 1
-    for group in standings:
-        standings[group] = sorted(standings[group].items(),
-                                  key=lambda x: (x[1]["points"], x[1]["gf"] - x[1]["ga"], x[1]["gf"]),
-                                  reverse=True)
-    return standings
-
-def generate_knockout_schedule(standings, last_group_time):
-    """Generate the Cup knockout bracket using top-2 teams from each group."""
-    knockout_matches = []
-    match_id = 13
-    start_time = datetime.strptime(last_group_time, "%H:%M:%S") + timedelta(minutes=3)
-    # Quarterfinals: Pairings based on standings
-    qf_teams = [
-        (f"{team_dict[standings['A'][0][0]]}", f"{team_dict[standings['C'][1][0]]}", "Quarterfinal 1"),
-        (f"{team_dict[standings['B'][0][0]]}", f"{team_dict[standings['D'][1][0]]}", "Quarterfinal 2"),
-        (f"{team_dict[standings['C'][0][0]]}", f"{team_dict[standings['A'][1][0]]}", "Quarterfinal 3"),
-        (f"{team_dict[standings['D'][0][0]]}", f"{team_dict[standings['B'][1][0]]}", "Quarterfinal 4")
-    ]
-    for t1, t2, round_name in qf_teams:
-        end_time = start_time + timedelta(minutes=12)
-        knockout_matches.append({
-            "match": match_id,
-            "teams": f"{t1} vs {t2}",
-            "group": round_name,
-            "start_time": start_time.strftime("%H:%M:%S"),
-            "end_time": end_time.strftime("%H:%M:%S")
-        })
-        match_id += 1
-        start_time = end_time + timedelta(minutes=3)
-    # Semifinals
-    semi_teams = [
-        ("Winner QF1", "Winner QF2", "Semifinal 1"),
-        ("Winner QF3", "Winner QF4", "Semifinal 2")
-    ]
-    for t1, t2, round_name in semi_teams:
-        end_time = start_time + timedelta(minutes=12)
-        knockout_matches.append({
-            "match": match_id,
-            "teams": f"{t1} vs {t2}",
-            "group": round_name,
-            "start_time": start_time.strftime("%H:%M:%S"),
-            "end_time": end_time.strftime("%H:%M:%S")
-        })
-        match_id += 1
-        start_time = end_time + timedelta(minutes=3)
-    # Finals & Third-Place playoff
-    final_teams = [
-        ("Loser SF1", "Loser SF2", "Cup 3rd Place Playoff", 12),
-        ("Winner SF1", "Winner SF2", "Cup Final", 17)
-    ]
-    for t1, t2, round_name, duration in final_teams:
-        end_time = start_time + timedelta(minutes=duration)
-        knockout_matches.append({
-            "match": match_id,
-            "teams": f"{t1} vs {t2}",
-            "group": round_name,
-            "start_time": start_time.strftime("%H:%M:%S"),
-            "end_time": end_time.strftime("%H:%M:%S")
-        })
-        match_id += 1
-        start_time = end_time + timedelta(minutes=3)
-    return pd.DataFrame(knockout_matches)
-
-def generate_bowl_schedule(standings, last_group_time):
-    """Generate the Bowl bracket using the 3rd-place teams from each group."""
-    knockout_matches = []
-    match_id = 25  # IDs for Bowl bracket start after Cup
-    start_time = datetime.strptime(last_group_time, "%H:%M:%S") + timedelta(minutes=5)
-    # 3rd-place teams from groups A-D
-    bowl_teams = [
-        team_dict[standings["A"][2][0]],
-        team_dict[standings["B"][2][0]],
-        team_dict[standings["C"][2][0]],
-        team_dict[standings["D"][2][0]],
-    ]
-    # Bowl Semifinals
-    sf_pairs = [
-        (bowl_teams[0], bowl_teams[1], "Bowl Semifinal 1"),
-        (bowl_teams[2], bowl_teams[3], "Bowl Semifinal 2"),
-    ]
-    for t1, t2, round_name in sf_pairs:
-        end_time = start_time + timedelta(minutes=12)
-        knockout_matches.append({
-            "match": match_id,
-            "teams": f"{t1} vs {t2}",
-            "group": round_name,
-            "start_time": start_time.strftime("%H:%M:%S"),
-            "end_time": end_time.strftime("%H:%M:%S")
-        })
-        match_id += 1
-        start_time = end_time + timedelta(minutes=3)
-    # Bowl Finals & Third-Place playoff
-    final_teams = [
-        ("Loser Bowl Semifinal 1", "Loser Bowl Semifinal 2", "Bowl 3rd Place", 12),
-        ("Winner Bowl Semifinal 1", "Winner Bowl Semifinal 2", "Bowl Final", 17),
-    ]
-    for t1, t2, round_name, duration in final_teams:
-        end_time = start_time + timedelta(minutes=duration)
-        knockout_matches.append({
-            "match": match_id,
-            "teams": f"{t1} vs {t2}",
-            "group": round_name,
-            "start_time": start_time.strftime("%H:%M:%S"),
-            "end_time": end_time.strftime("%H:%M:%S")
-        })
-        match_id += 1
-        start_time = end_time + timedelta(minutes=3)
-    return pd.DataFrame(knockout_matches)
+                    heapq.heappush(pending, (at, m))
+            start[best] = max(free, ready_at(best))
+            end[best] = start[best] + durations[best]
+            pitch[best] = p
+            for team in known[best]:
+                team_free[team] = end[best] + rest
+            heapq.heappush(pitch_free, (end[best] + gap, p))
+            for child in graph.children.get(best, ()):
+                left[child] -= 1
+                if not left[child]:
+                    heapq.heappush(pending, (ready_at(child), child))
+        return start, end, pitch
 
-def resolve_knockout_teams(full_schedule, scores):
-    """Replace placeholders (e.g., 'Winner QF1') with actual team names based on match scores."""
-    for i, row in full_schedule.iterrows():
-        if "Winner" in row["teams"] or "Loser" in row["teams"]:
-            t1, t2 = row["teams"].split(" vs ")
-            for team in [t1, t2]:
-                if "Winner" in team or "Loser" in team:
-                    try:
-                        if "Winner" in team:
-                            bracket_ref = team.split("Winner ")[1].strip()
-                        else:
-                            bracket_ref = team.split("Loser ")[1].strip()
-                    except IndexError:
-                        continue
-                    mask = full_schedule["group"].str.contains(bracket_ref, case=False, na=False)
-                    if not full_schedule[mask].empty:
-                        match_id = full_schedule[mask]["match"].values[0]
-                        score_val = scores[scores["match"] == match_id]["score"].values
-                        if len(score_val) > 0 and pd.notna(score_val[0]):
-                            prev_match_teams = full_schedule[full_schedule["match"] == match_id]["teams"].values[0]
-                            prev_t1, prev_t2 = prev_match_teams.split(" vs ")
-                            try:
-                                s1, s2 = map(int, score_val[0].split("-"))
-                            except ValueError:
-                                continue
-                            if "Winner" in team:
-                                winner = prev_t1 if s1 > s2 else prev_t2
-                                full_schedule.loc[i, "teams"] = full_schedule.loc[i, "teams"].replace(team, winner)
-                            else:
-                                loser = prev_t2 if s1 > s2 else prev_t1
-                                full_schedule.loc[i, "teams"] = full_schedule.loc[i, "teams"].replace(team, loser)
-    return full_schedule
+    start, end, pitch = list_schedule({m: (-tail.get(m, 0), i) for i, m in enumerate(ids)})
+    finals = {bracket["final"] for bracket in config["brackets"]}
+    is_final = {m: stage in finals for m, stage in zip(ids, fixtures["group"].tolist())}
+    if any(is_final.values()):
+        # Longest tail first favours the longer final over its 3rd place playoff; play the finals
+        # after the matches they could share a slot with instead, unless that ends the day later
+        finals_last = list_schedule({m: (is_final[m], -tail.get(m, 0), i) for i, m in enumerate(ids)})
+        if max(finals_last[1].values()) <= max(end.values()):
+            start, end, pitch = finals_last
 
-def load_full_schedule():
+    scheduled = fixtures.drop(columns=["duration", "release"])
+    scheduled["start_time"] = [_clock(start[m]) for m in ids]
+    scheduled["end_time"] = [_clock(end[m]) for m in ids]
+    scheduled["pitch"] = [pitch[m] for m in ids]
+    return scheduled
+
+def round_robin_rounds(codes):
+    """Circle-method round robin: a list of rounds, each a list of (home, away) pairs."""
+    codes = list(codes)
+    if len(codes) % 2:
+        codes.append(None)
+    n = len(codes)
+    rounds = []
+    for _ in range(n - 1):
+        pairs = [(codes[i], codes[n - 1 - i]) for i in range(n // 2)]
+        rounds.append([(a, b) for a, b in pairs if a is not None and b is not None])
+        codes = [codes[0], codes[-1]] + codes[1:-1]
+    return rounds
+
+def generate_group_schedule(config=None):
+    """Round-robin group fixtures for every group in the config, interleaved round by round and scheduled on the pitches."""
+    config = tournament_config if config is None else config
+    by_group = defaultdict(list)
+    for t in config["teams"]:
+        by_group[t["group"]].append(t["code"])
+    group_rounds = {group: round_robin_rounds(codes) for group, codes in by_group.items()}
+    match_teams, groups = [], []
+    for r in range(max((len(rounds) for rounds in group_rounds.values()), default=0)):
+        for group, rounds in group_rounds.items():
+            for t1, t2 in rounds[r] if r < len(rounds) else ():
+                match_teams.append(f"{t1} vs {t2}")
+                groups.append(group)
+    n = len(match_teams)
+    fixtures = pd.DataFrame({
+        "match": np.arange(1, n + 1),
+        "teams": match_teams,
+        "group": groups,
+        "duration": np.full(n, config["match_minutes"] * 60),
+        "release": np.full(n, _seconds(config["start_time"])),
+    })
+    return schedule_matches(fixtures, config)
+
+def _round_label(matches_in_round):
+    return {2: "Semifinal", 4: "Quarterfinal"}.get(matches_in_round, f"Round of {2 * matches_in_round}")
+
+def bracket_seed_slots(group_names, positions):
     """
-    Load group stage schedule and scores.
-    Only generate knockout brackets (Cup & Bowl) if all group matches have a score.
+    (group, position) of each bracket slot in order (consecutive pairs meet in the first round).
+    With two qualifying positions, group winners meet the runner-up from the group half a table away
+    (A1 v C2, B1 v D2, ...); otherwise qualifiers are paired in group order.
+    """
+    group_names = list(group_names)
+    if len(positions) == 2:
+        half = len(group_names) // 2
+        slots = []
+        for i, group in enumerate(group_names):
+            slots += [(group, positions[0]), (group_names[(i + half) % len(group_names)], positions[1])]
+        return slots
+    return [(group, pos) for pos in positions for group in group_names]
+
+def bracket_seeds(standings, positions, seeding="groups", config=None, count=None):
+    """
+    Team codes in bracket order for the given group standings. With "ranked" seeding the
+    qualifiers are ranked across groups, only the best ``count`` (default: all) go through,
+    and the best meets the worst (1v4, 2v3, ...).
+    """
+    if seeding == "ranked":
+        qualifiers = [standings[group][pos - 1][0] for pos in positions for group in standings]
+        ranked = rank_across_groups(qualifiers, standings, config)[:count]
+        if len(ranked) & (len(ranked) - 1):
+            return ranked  # not a power of two; bracket_fixtures reports it
+        return [ranked[i] for i in seeded_order(len(ranked))]
+    return [standings[group][pos - 1][0] for group, pos in bracket_seed_slots(standings, positions)]
+
+def bracket_fixtures(standings, last_group_time, bracket, config=None, first_match=None):
+    """
+    Unscheduled single-elimination fixtures for one config entry (Cup, Plate, Bowl...):
+    every round, then the 3rd place playoff and the final, released ``start_offset_minutes``
+    after the group stage.
+    """
+    config = tournament_config if config is None else config
+    names = {t["code"]: t["name"] for t in config["teams"]}
+    seeds = [names.get(code, code)
+             for code in bracket_seeds(standings, bracket["positions"], bracket["seeding"], config, bracket["count"])]
+    if len(seeds) < 2 or len(seeds) & (len(seeds) - 1):
+        raise ValueError(f"{bracket['name']} bracket needs a power-of-two number of teams, got {len(seeds)}")
+    prefix = bracket["round_prefix"]
+    match_teams, rounds, long_match = [], [], []
+    sides = seeds
+    while len(sides) > 2:
+        label = _round_label(len(sides) // 2)
+        names = [f"{prefix}{label} {i + 1}" for i in range(len(sides) // 2)]
+        match_teams += [f"{sides[2 * i]} vs {sides[2 * i + 1]}" for i in range(len(names))]
+        rounds += names
+        long_match += [False] * len(names)
+        refs = [round_refs.get(name, name) for name in names]
+        losers, sides = [f"Loser {ref}" for ref in refs], [f"Winner {ref}" for ref in refs]
+    if bracket["third_place"] and len(seeds) > 2:
+        match_teams.append(f"{losers[0]} vs {losers[1]}")
+        rounds.append(bracket["third_place"])
+        long_match.append(False)
+    match_teams.append(f"{sides[0]} vs {sides[1]}")
+    rounds.append(bracket["final"])
+    long_match.append(True)
+
+    n = len(match_teams)
+    first_match = bracket["first_match"] if first_match is None else first_match
+    return pd.DataFrame({
+        "match": first_match + np.arange(n),
+        "teams": match_teams,
+        "group": rounds,
+        "duration": np.where(long_match, config["final_minutes"], config["match_minutes"]) * 60,
+        "release": np.full(n, _seconds(last_group_time) + bracket["start_offset_minutes"] * 60),
+    })
+
+def bracket_size(bracket, config=None):
+    """Number of teams in one config bracket: its count, else one per group for each qualifying position."""
+    config = tournament_config if config is None else config
+    if bracket.get("count") is not None:
+        return bracket["count"]
+    return len({t["group"] for t in config["teams"]}) * len(bracket["positions"])
+
+def bracket_round_names(bracket, config=None):
+    """Round names ("group" column values) of one config bracket, in playing order."""
+    n_seeds = bracket_size(bracket, config)
+    names = []
+    while n_seeds > 2:
+        label = _round_label(n_seeds // 2)
+        names += [f"{bracket['round_prefix']}{label} {i + 1}" for i in range(n_seeds // 2)]
+        n_seeds //= 2
+    if bracket["third_place"] and len(names):
+        names.append(bracket["third_place"])
+    return names + [bracket["final"]]
+
+@timings.timed("knockout generation")
+def generate_knockout_brackets(standings, last_group_time, config=None, next_match=1, team_ready=None):
+    """
+    Every bracket in the config, scheduled together so they share the pitches.
+    Match ids continue from ``next_match`` / the previous bracket when not fixed.
+    """
+    config = tournament_config if config is None else config
+    frames = []
+    for bracket in config["brackets"]:
+        frame = bracket_fixtures(standings, last_group_time, bracket, config,
+                                 first_match=bracket["first_match"] or next_match)
+        next_match = int(frame["match"].iloc[-1]) + 1
+        frames.append(frame)
+    if not frames:
+        return None
+    return schedule_matches(pd.concat(frames, ignore_index=True), config, team_ready)
+
+def team_availability(group_schedule, config=None):
+    """Second at which each team (by name) is free again after its last group match."""
+    config = tournament_config if config is None else config
+    rest = max(config["rest_minutes"], config["gap_minutes"]) * 60
+    names = roster if config is tournament_config else Roster(config["teams"])
+    ready = {}
+    for match_teams, end_time in zip(group_schedule["teams"].tolist(), group_schedule["end_time"].tolist()):
+        for code in split_sides(match_teams) or ():
+            name = names.name(code)
+            ready[name] = max(ready.get(name, 0), _seconds(end_time) + rest)
+    return ready
+
+# --------------------
+# BRACKET RESOLUTION
+# --------------------
+class BracketGraph:
+    """
+    The schedule as a DAG of match nodes. A "Winner X" / "Loser X" slot is an edge
+    from feeder match X, so every placeholder resolves in one topological pass and a
+    new score only re-resolves the matches downstream of it.
     """
-    group_schedule = load_csv(GROUP_SCHEDULE_FILE, ["match", "teams", "group", "start_time", "end_time"])
-    scores = load_csv(SCORES_FILE, ["match", "score"])
-    group_stage_complete = True
-    for _, row in group_schedule.iterrows():
-        score_val = scores[scores["match"] == row["match"]]["score"].values
-        if len(score_val) == 0 or pd.isna(score_val[0]):
-            group_stage_complete = False
-            break
 
+    def __init__(self, schedule):
+        self.key = self.structure_key(schedule)
+        matches, match_teams, rounds = zip(*self.key) if self.key else ((), (), ())
+        round_index = {}
+        for match, round_name in zip(matches, rounds):
+            round_index.setdefault(str(round_name).lower(), match)
+        self.slots = {}
+        self.children = defaultdict(list)
+        for match, teams_str in zip(matches, match_teams):
+            sides = split_sides(teams_str)
+            if sides is None:
+                continue
+            slots = [self._feeder_slot(side, round_index) for side in sides]
+            for slot in slots:
+                if isinstance(slot, tuple):
+                    self.children[slot[1]].append(match)
+            self.slots[match] = slots
+        self.order = self._topological_order()
+        self.position = {match: i for i, match in enumerate(self.order)}
+        self.results = {}
+        self.teams = {}
+
+    @staticmethod
+    def structure_key(schedule):
+        """Identity of the bracket structure: (match, teams, round) of every row."""
+        return tuple(zip(schedule["match"].tolist(), schedule["teams"].tolist(), schedule["group"].tolist()))
+
+    @staticmethod
+    def _feeder_slot(side, round_index):
+        """``(kind, feeder_match, placeholder)`` for a "Winner/Loser <round>" slot, else the team string."""
+        for kind in ("Winner", "Loser"):
+            if side.startswith(kind + " "):
+                ref = side[len(kind) + 1:].strip()
+                feeder = round_index.get(knockout_map.get(ref, ref).lower())
+                if feeder is not None:
+                    return kind, feeder, side
+        return side
+
+    def _topological_order(self):
+        indegree = {match: 0 for match in self.slots}
+        for match, slots in self.slots.items():
+            indegree[match] = sum(isinstance(slot, tuple) and slot[1] in self.slots for slot in slots)
+        ready = [match for match, degree in indegree.items() if degree == 0]
+        order = []
+        while ready:
+            match = ready.pop()
+            order.append(match)
+            for child in self.children.get(match, ()):
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    ready.append(child)
+        return order
+
+    def load(self, scores):
+        """Resolve every match from ``scores`` (first row per match)."""
+        first = _first_scores(scores)
+        self.results = {match: parse_score(score) for match, score in zip(first["match"].tolist(), first["score"].tolist())}
+        for match in self.order:
+            self._resolve(match)
+        return self
+
+    def set_score(self, match, score):
+        """Record one result and re-resolve only the matches that depend on it."""
+        self.results[match] = parse_score(score)
+        downstream, stack = set(), list(self.children.get(match, ()))
+        while stack:
+            child = stack.pop()
+            if child not in downstream:
+                downstream.add(child)
+                stack.extend(self.children.get(child, ()))
+        for child in sorted(downstream, key=lambda m: self.position.get(m, len(self.order))):
+            self._resolve(child)
+
+    def _resolve(self, match):
+        names = []
+        for slot in self.slots[match]:
+            if isinstance(slot, tuple):
+                kind, feeder, placeholder = slot
+                result = self.results.get(feeder)
+                if result is None or feeder not in self.teams:
+                    names.append(placeholder)
+                    continue
+                t1, t2 = self.teams[feeder]
+                home_won = result.home > result.away
+                if kind == "Winner":
+                    names.append(t1 if home_won else t2)
+                else:
+                    names.append(t2 if home_won else t1)
+            else:
+                names.append(slot)
+        self.teams[match] = tuple(names)
+
+    def apply(self, schedule):
+        """Copy of ``schedule`` with every resolvable placeholder replaced by a team name."""
+        resolved = schedule.copy()
+        resolved["teams"] = [f"{self.teams[m][0]} vs {self.teams[m][1]}" if m in self.teams else t
+                             for m, t in zip(resolved["match"].tolist(), resolved["teams"].tolist())]
+        return resolved
+
+@timings.timed("resolve_knockout_teams")
+def resolve_knockout_teams(full_schedule, scores):
+    """Replace placeholders (e.g., 'Winner QF1') with actual team names based on match scores."""
+    return BracketGraph(full_schedule).load(scores).apply(full_schedule)
+
+def _base_schedule(group_schedule, scores, standings):
+    """Group schedule plus the (unresolved) Cup & Bowl brackets once the group stage is complete."""
+    group_stage_complete = group_stage_is_complete(group_schedule, scores)
     if group_stage_complete:
-        standings = calculate_group_standings(group_schedule, scores)
         last_group_time = group_schedule["end_time"].iloc[-1]
-        cup_schedule = generate_knockout_schedule(standings, last_group_time)
-        bowl_schedule = generate_bowl_schedule(standings, last_group_time)
-        knockout_schedule = pd.concat([cup_schedule, bowl_schedule], ignore_index=True)
+        knockout_schedule = generate_knockout_brackets(standings, last_group_time,
+                                                       next_match=int(group_schedule["match"].max()) + 1,
+                                                       team_ready=team_availability(group_schedule))
         full_schedule = pd.concat([group_schedule, knockout_schedule], ignore_index=True)
+        full_schedule["pitch"] = full_schedule["pitch"].astype("Int64")
     else:
         full_schedule = group_schedule.copy()
-    
+    return full_schedule, group_stage_complete
+
+@timings.timed("load_full_schedule")
+def load_full_schedule():
+    """
+    Load group stage schedule and scores.
+    Only generate knockout brackets (Cup & Bowl) if all group matches have a score.
+    """
+    group_schedule = load_group_schedule()
+    scores = load_scores()
+    standings = calculate_group_standings(group_schedule, scores)
+    full_schedule, group_stage_complete = _base_schedule(group_schedule, scores, standings)
     full_schedule = resolve_knockout_teams(full_schedule, scores)
-    full_schedule["teams"] = full_schedule["teams"].apply(replace_codes_with_names)
+    full_schedule["teams"] = [roster.display(t) for t in full_schedule["teams"].tolist()]
     return full_schedule, scores, group_stage_complete
 
+# --------------------
+# SHARED TOURNAMENT STATE CACHE
+# --------------------
+def tournament_signature(store_signature=None):
+    """Version key of the active tournament's data; changes whenever a score is written."""
+    if store_signature is None:
+        store_signature = get_score_store().signature()
+    return TOURNAMENT_KEY, file_signature(GROUP_SCHEDULE_FILE), store_signature
+
+@st.cache_data(show_spinner=False, max_entries=2 * MAX_CACHED_TOURNAMENTS)
+def _load_tournament_state(signature):
+    """
+    Build schedule, scores, standings and brackets once per version of the data files.
+    Cached process-wide, so every session reuses the result until a score changes.
+    """
+    group_schedule = load_group_schedule()
+    scores = load_scores()
+    standings = current_standings(group_schedule, scores, signature)
+    full_schedule, group_stage_complete = _base_schedule(group_schedule, scores, standings)
+    full_schedule = current_bracket(full_schedule, scores, signature).apply(full_schedule)
+    full_schedule["teams"] = [roster.display(t) for t in full_schedule["teams"].tolist()]
+    return {
+        "schedule": full_schedule,
+        "scores": scores,
+        "standings": standings,
+        "group_stage_complete": group_stage_complete,
+        "signature": signature,
+    }
+
+@timings.timed("load_tournament_state")
+def load_tournament_state():
+    """Return the cached tournament state for the current contents of the data files."""
+    return _load_tournament_state(tournament_signature())
+
+@st.cache_data(show_spinner="Simulating the rest of the tournament...", max_entries=2 * MAX_CACHED_TOURNAMENTS)
+def qualification_odds(signature, model="uniform"):
+    """Each team's position, qualification and bracket-win odds, simulated once per version of the data."""
+    import simulation  # imports this module, so load it on first use
+    state = _load_tournament_state(signature)
+    return simulation.qualification_odds(load_group_schedule(), state["scores"], state["schedule"],
+                                         config=tournament_config, model=model,
+                                         n_sims=ODDS_SIMULATIONS, workers=1, seed=0,
+                                         exhaustive_limit=ODDS_SIMULATIONS)
+
 # --------------------
 # IMPROVED BRACKET UI FUNCTIONS
 # --------------------
+def _bracket_rounds():
+    """Round name -> (bracket name, playing order) for every configured bracket."""
+    rounds = {}
+    for bracket in tournament_config["brackets"]:
+        for name in bracket_round_names(bracket):
+            rounds.setdefault(name, (bracket["name"], len(rounds)))
+    return rounds
+
+@st.cache_resource(show_spinner=False)
+def _html_fragments():
+    """
+    Memoized renderers for one bracket match and one bracket round. Built once per process:
+    Streamlit re-executes this script on every rerun, so module-level memos would start empty.
+    """
+    @functools.lru_cache(maxsize=4096)
+    def match_html(match_str, score_str):
+        return (
+            f"<div class='bracket-match'>"
+            f"<div class='match-teams'>{match_str}</div>"
+            f"<div class='match-score'>{score_str}</div>"
+            f"</div>"
+        )
+
+    @functools.lru_cache(maxsize=1024)
+    def round_html(round_name, matches):
+        """One bracket column; ``matches`` is a tuple of (match_str, score_str), so unchanged rounds are reused."""
+        return (f"<div class='bracket-round'><div class='round-title'>{round_name}</div>"
+                + "".join(match_html(match_str, score_str) for match_str, score_str in matches)
+                + "</div>")
+
+    return match_html, round_html
+
 def create_bracket_html(matches, bracket_title):
     # Group matches by round
     rounds = defaultdict(list)
     for m in matches:
-        rounds[m["round"]].append(m)
-    # Order rounds in a custom order (you can adjust this as needed)
-    custom_order = ["Quarterfinal 1", "Quarterfinal 2", "Quarterfinal 3", "Quarterfinal 4",
-                    "Semifinal 1", "Semifinal 2", "Cup 3rd Place Playoff", "Cup Final",
-                    "Bowl Semifinal 1", "Bowl Semifinal 2", "Bowl 3rd Place", "Bowl Final"]
-    sorted_rounds = sorted(rounds.keys(), key=lambda r: custom_order.index(r) if r in custom_order else 999)
-    
-    html = f"<div class='bracket-title'>{bracket_title}</div><div class='bracket-container'>"
-    for r in sorted_rounds:
-        html += "<div class='bracket-round'>"
-        html += f"<div class='round-title'>{r}</div>"
-        for match in rounds[r]:
-            html += (
-                f"<div class='bracket-match'>"
-                f"<div class='match-teams'>{match['match_str']}</div>"
-                f"<div class='match-score'>{match['score_str']}</div>"
-                f"</div>"
-            )
-        html += "</div>"
-    html += "</div>"
-    return html
-
-def build_bracket_data(schedule_df, scores_df, bracket_filter):
-    bracket_matches = schedule_df[schedule_df["group"].str.contains(bracket_filter, case=False, na=False)]
-    bracket_data = []
-    for _, row in bracket_matches.iterrows():
-        match_id = row["match"]
-        match_str = row["teams"]
-        round_name = row["group"]
-        score_val = scores_df[scores_df["match"] == match_id]["score"].values
-        score_str = score_val[0] if (len(score_val) > 0 and pd.notna(score_val[0])) else "TBD"
-        bracket_data.append({
-            "round": round_name,
-            "match_str": match_str,
-            "score_str": score_str
-        })
-    return bracket_data
+        rounds[m["round"]].append((m["match_str"], m["score_str"]))
+    sorted_rounds = sorted(rounds, key=lambda r: bracket_rounds.get(r, (None, 999))[1])
+    _, round_html = _html_fragments()
+    return (f"<div class='bracket-title'>{bracket_title}</div><div class='bracket-container'>"
+            + "".join(round_html(r, tuple(rounds[r])) for r in sorted_rounds)
+            + "</div>")
+
+def _score_lookup(scores_df):
+    """Match id -> score string ("TBD" when missing) for O(1) lookups."""
+    first = _first_scores(scores_df)
+    return {match: score for match, score in zip(first["match"].tolist(), first["score"].tolist())
+            if pd.notna(score)}
+
+def partition_brackets(schedule_df, scores_df):
+    """Bracket data for every configured bracket, ``{bracket name: [match, ...]}``, in one pass over the schedule."""
+    scores_by_match = _score_lookup(scores_df)
+    brackets = {bracket["name"]: [] for bracket in tournament_config["brackets"]}
+    for match_id, match_str, round_name in zip(schedule_df["match"].tolist(), schedule_df["teams"].tolist(),
+                                               schedule_df["group"].tolist()):
+        if round_name in bracket_rounds:
+            brackets[bracket_rounds[round_name][0]].append(
+                {"round": round_name, "match_str": match_str, "score_str": scores_by_match.get(match_id, "TBD")})
+    return brackets
 
 def display_brackets(schedule_df, scores_df):
-    # Build Cup bracket data
-    cup_bracket_data = build_bracket_data(schedule_df, scores_df, "Quarterfinal")
-    cup_bracket_data += build_bracket_data(schedule_df, scores_df, "Semifinal")
-    cup_bracket_data += build_bracket_data(schedule_df, scores_df, "Cup Final")
-    cup_bracket_data += build_bracket_data(schedule_df, scores_df, "3rd Place")
-    # Build Bowl bracket data
-    bowl_bracket_data = build_bracket_data(schedule_df, scores_df, "Bowl Semifinal")
-    bowl_bracket_data += build_bracket_data(schedule_df, scores_df, "Bowl Final")
-    bowl_bracket_data += build_bracket_data(schedule_df, scores_df, "Bowl 3rd Place")
-    
-    cup_html = create_bracket_html(cup_bracket_data, "Cup Knockout Bracket")
-    bowl_html = create_bracket_html(bowl_bracket_data, "Bowl Knockout Bracket")
-    
-    st.markdown(cup_html, unsafe_allow_html=True)
-    st.markdown(bowl_html, unsafe_allow_html=True)
+    for name, bracket_data in partition_brackets(schedule_df, scores_df).items():
+        st.markdown(create_bracket_html(bracket_data, f"{name} Knockout Bracket"), unsafe_allow_html=True)
+
+# --------------------
+# LIVE UPDATES
+# --------------------
+class ScoreFeed:
+    """
+    In-process change feed. update_score() publishes the matches it changed; every
+    spectator session polls the version number, which costs nothing while idle.
+    Writes from other processes are picked up through the data signature, checked
+    at most once a second for the whole process.
+    """
+
+    def __init__(self, history=256):
+        self.version = 0
+        self.changes = deque(maxlen=history)
+        self.signature = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def publish(self, matches, signature=None):
+        with self._lock:
+            for match in matches:
+                self.version += 1
+                self.changes.append((self.version, match))
+            if signature is not None:
+                self.signature = signature
+
+    def poll(self):
+        """Current version, bumped if the data changed outside this process since the last check."""
+        now = time.monotonic()
+        if now - self._checked >= 1:
+            with self._lock:
+                self._checked = now
+                signature = tournament_signature()
+                if self.signature is not None and signature != self.signature:
+                    self.version += 1
+                    self.changes.append((self.version, None))
+                self.signature = signature
+        return self.version
+
+    def changes_since(self, version):
+        """Matches changed after ``version`` (None entries mean "something changed elsewhere")."""
+        with self._lock:
+            if self.changes and self.changes[0][0] > version + 1:
+                return [None]
+            return list(dict.fromkeys(match for v, match in self.changes if v > version))
+
+@st.cache_resource(show_spinner=False, max_entries=MAX_CACHED_TOURNAMENTS)
+def _score_feed(tournament_key):
+    return ScoreFeed()
+
+def get_score_feed():
+    return _score_feed(TOURNAMENT_KEY)
+
+def _static_view_key(state):
+    """Digest of what the Schedule and Knockout Brackets tabs show; the live views cover the rest."""
+    schedule = state["schedule"]
+    scores = _score_lookup(state["scores"])
+    knockout_scores = [scores.get(m) for m, round_name in zip(schedule["match"].tolist(), schedule["group"].tolist())
+                       if round_name in bracket_rounds]
+    digest = hashlib.sha1(pd.util.hash_pandas_object(schedule, index=False).values.tobytes())
+    digest.update(repr((state["group_stage_complete"], knockout_scores)).encode())
+    return digest.hexdigest()
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_updates():
+    """
+    Tiny auto-refreshing fragment that announces score changes. The Scores, Standings and
+    Odds views refresh themselves; the page only reruns when the schedule or brackets changed.
+    """
+    feed = get_score_feed()
+    version = feed.poll()
+    seen = st.session_state.setdefault("live_version", version)
+    if version != seen:
+        st.session_state.live_version = version
+        st.session_state.live_changes = feed.changes_since(seen)
+        state = load_tournament_state()
+        if _static_view_key(state) != st.session_state.get("static_view_key"):
+            st.rerun()
+        announce_live_changes(state)
+    st.caption(f"🔴 Live: scores update automatically every {LIVE_REFRESH_SECONDS}s")
+
+def announce_live_changes(state):
+    """Toast the matches whose scores changed since this session last rendered."""
+    changes = st.session_state.pop("live_changes", None) or []
+    if None in changes:
+        st.toast("Scores updated")
+    rows = state["schedule"].merge(state["scores"], on="match", how="left").set_index("match")
+    for match in changes:
+        if match is not None and match in rows.index:
+            row = rows.loc[match]
+            score = row["score"] if pd.notna(row["score"]) else "score cleared"
+            st.toast(f"Match {match}: {row['teams']} {score}")
 
 # --------------------
 # DISPLAY TOURNAMENT DATA
 # --------------------
-def display_tournament_data():
-    full_schedule, scores, group_stage_complete = load_full_schedule()
-    tabs = st.tabs(["📅 Schedule", "⚽ Scores", "🏆 Standings", "🏅 Knockout Brackets"])
-    with tabs[0]:
-        st.markdown('<h2 class="section-header">Tournament Schedule</h2>', unsafe_allow_html=True)
-        st.dataframe(full_schedule.style.set_properties(**{"text-align": "center"}))
-    with tabs[1]:
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_scores():
+    """Scores tab; redraws itself from the shared state, so a new score needs no page rerun."""
+    with timings.stage("render: Scores tab"):
+        state = load_tournament_state()
         st.markdown('<h2 class="section-header">Scores</h2>', unsafe_allow_html=True)
-        schedule_subset = full_schedule[['match', 'teams']]
-        merged_scores = pd.merge(schedule_subset, scores, on="match", how="left")
-        st.dataframe(merged_scores.style.set_properties(**{"text-align": "center"}))
-    with tabs[2]:
+        merged_scores = pd.merge(state["schedule"][["match", "teams"]], state["scores"], on="match", how="left")
+        st.dataframe(merged_scores, column_config=centered_columns(merged_scores))
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_standings():
+    with timings.stage("render: Standings tab"):
+        state = load_tournament_state()
         st.markdown('<h2 class="section-header">Group Standings</h2>', unsafe_allow_html=True)
-        group_schedule = load_csv(GROUP_SCHEDULE_FILE, ["match", "teams", "group", "start_time", "end_time"])
-        standings = calculate_group_standings(group_schedule, scores)
-        for group, ranking in standings.items():
+        for group, ranking in state["standings"].items():
             st.write(f"**Group {group}**")
             df = pd.DataFrame([{"team": team_dict.get(t, t), **stats} for t, stats in ranking])
-            st.dataframe(df.style.set_properties(**{"text-align": "center"}))
-    with tabs[3]:
+            st.dataframe(df, column_config=centered_columns(df))
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_odds():
+    with timings.stage("render: Odds tab"):
+        state = load_tournament_state()
+        st.markdown('<h2 class="section-header">Qualification Odds</h2>', unsafe_allow_html=True)
+        models = {"Every scoreline equally likely": "uniform", "Weighted by form so far": "strength"}
+        model = st.radio("Remaining matches", list(models), horizontal=True)
+        odds = qualification_odds(state["signature"], models[model])
+        percent = {column: st.column_config.NumberColumn(column, format="percent")
+                   for column in odds.columns if column.startswith("P(")}
+        st.dataframe(odds.drop(columns="code"), column_config=percent, hide_index=True)
+        st.caption(f"Based on {odds.attrs['method']} of the remaining group matches.")
+
+def display_tournament_data():
+    state = load_tournament_state()
+    full_schedule, scores = state["schedule"], state["scores"]
+    group_stage_complete = state["group_stage_complete"]
+    st.session_state.static_view_key = _static_view_key(state)
+    announce_live_changes(state)
+    tabs = st.tabs(["📅 Schedule", "⚽ Scores", "🏆 Standings", "🏅 Knockout Brackets", "🎲 Odds"])
+    with tabs[0], timings.stage("render: Schedule tab"):
+        st.markdown('<h2 class="section-header">Tournament Schedule</h2>', unsafe_allow_html=True)
+        st.dataframe(full_schedule, column_config=centered_columns(full_schedule))
+    with tabs[1]:
+        live_scores()
+    with tabs[2]:
+        live_standings()
+    with tabs[3], timings.stage("render: Knockout Brackets tab"):
         st.markdown('<h2 class="section-header">Knockout Brackets</h2>', unsafe_allow_html=True)
         if group_stage_complete:
             display_brackets(full_schedule, scores)
         else:
             st.info("Knockout brackets will be displayed once the group stage is complete.")
+    with tabs[4]:
+        live_odds()
+
+def display_admin_panel():
+    st.markdown('<div class="admin-panel">', unsafe_allow_html=True)
+    st.header("Admin Control Panel")
+    state = load_tournament_state()
+    full_schedule, scores = state["schedule"], state["scores"]
+    merged = full_schedule.merge(scores, on="match", how="left")
+    pending_matches = merged[merged["score"].isna()]["match"].tolist()
+    all_matches = full_schedule["match"].tolist()
+    mode = st.radio("Mode", ["Add New Score", "Edit Old Score", "Import Batch"], horizontal=True)
+    if mode == "Import Batch":
+        display_batch_import(full_schedule, scores)
+        st.markdown('</div>', unsafe_allow_html=True)
+        return
+    if mode == "Add New Score":
+        match = st.selectbox("Select Pending Match", pending_matches, key="match_select_pending")
+    else:
+        match = st.selectbox("Select Match to Edit", all_matches, key="match_select_all")
+    match_teams = full_schedule[full_schedule["match"] == match]["teams"].values[0]
+    st.write(f"Selected: **{match_teams}**")
+    score_row = scores[scores["match"] == match]["score"].values
+    current_score = score_row[0] if (len(score_row) > 0 and pd.notna(score_row[0])) else ""
+    score = st.text_input("Enter Score (e.g., 2-1)", value=current_score, key="score_input_field")
+    store = get_score_store()
+    if mode == "Edit Old Score" and hasattr(store, "history"):
+        with st.expander("Score history"):
+            history = store.history(match)
+            if history:
+                st.dataframe(pd.DataFrame(history)[["ts", "score", "author"]], hide_index=True)
+            else:
+                st.write("No changes recorded for this match.")
+    if st.button("Update Score"):
+        update_score(match, score, author=st.session_state.get("username"))
+        st.success(f"Score updated for Match {match}!")
+        st.rerun()
+    st.markdown('</div>', unsafe_allow_html=True)
+
+def display_batch_import(full_schedule, scores):
+    """Paste or upload many results at once; nothing is written unless every row is valid."""
+    st.caption('CSV rows of "match,score" (header optional), or JSON such as [{"match": 5, "score": "2-1"}].')
+    text = st.text_area("Paste results", key="batch_text", height=160)
+    upload = st.file_uploader("...or upload a CSV/JSON file", type=["csv", "json", "txt"], key="batch_file")
+    try:
+        if upload is not None:
+            text = upload.getvalue().decode("utf-8-sig")  # a UnicodeDecodeError is a ValueError
+        if not text.strip():
+            return
+        items, errors = validate_score_batch(parse_score_batch(text), full_schedule)
+    except ValueError as e:
+        st.error(f"Could not read the results: {e}")
+        return
+    for error in errors:
+        st.error(error)
+    if not items:
+        return
+    current = _score_lookup(scores)
+    match_teams = dict(zip(full_schedule["match"].tolist(), full_schedule["teams"].tolist()))
+    st.dataframe(pd.DataFrame([{"match": m, "teams": match_teams[m], "current": current.get(m, ""), "new": score}
+                               for m, score in items]), hide_index=True)
+    if st.button(f"Apply {len(items)} scores", disabled=bool(errors)):
+        update_scores(items, author=st.session_state.get("username"))
+        st.success(f"Scores updated for {len(items)} matches!")
+        st.rerun()
+
+def display_performance_panel():
+    st.header("Performance")
+    recording = st.toggle("Record stage timings (all sessions)", value=timings.enabled)
+    if recording != timings.enabled:
+        timings.enabled = recording
+    summary = timings.summary()
+    if summary.empty:
+        st.info("No timings recorded yet. Switch recording on, then use the dashboard.")
+    else:
+        st.dataframe(summary.style.format(precision=1), hide_index=True)
+        stage = st.selectbox("Stage", summary["stage"].tolist())
+        samples = np.array(timings.recent(stage)) * 1e3
+        counts, edges = np.histogram(samples, bins=min(20, len(samples)))
+        st.bar_chart(pd.DataFrame({"calls": counts}, index=pd.Index(edges[:-1].round(1), name="ms")))
+        st.caption(f"Distribution of the last {len(samples)} calls, in milliseconds.")
+        if st.button("Reset timings"):
+            timings.reset()
+            st.rerun()
+
+    st.subheader("Profiler traces")
+    if st.button("Trace the next page rerun"):
+        profiler.request()
+    if profiler.pending:
+        st.info(f"{profiler.pending} trace(s) waiting for the next Dashboard or Admin Panel rerun (any session).")
+    traces = profiler.traces()
+    if traces:
+        trace = st.selectbox("Trace", traces, format_func=os.path.basename)
+        with open(trace, "rb") as f:
+            st.download_button("Download trace", f.read(), file_name=os.path.basename(trace))
+        if trace.endswith(".prof"):
+            st.code(profiler.top_functions(trace))
+
+def select_tournament():
+    """Activate the tournament named by the ?tournament= URL parameter, with a sidebar picker when there are several."""
+    registry = list(tournament_registry())
+    tournament_id = st.query_params.get("tournament")
+    if tournament_id not in registry:
+        tournament_id = registry[0] if registry else None
+    if len(registry) > 1:
+        def pick():
+            st.query_params["tournament"] = st.session_state.tournament_picker
+        st.sidebar.selectbox("Tournament", registry, index=registry.index(tournament_id),
+                             key="tournament_picker", on_change=pick)
+    use_tournament(tournament_id)
+    if st.session_state.get("tournament") != tournament_id:
+        # Live-update versions belong to one tournament's score feed
+        st.session_state.tournament = tournament_id
+        st.session_state.pop("live_version", None)
+        st.session_state.pop("live_changes", None)
+
+# Default tournament for importers (api.py, simulation.py, benchmark.py); main() picks one per rerun
+use_tournament()
+
+# --------------------
+# STYLES
+# --------------------
+STYLESHEET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "styles.css")
+
+@st.cache_resource(show_spinner=False)
+def _stylesheet():
+    """The stylesheet's text and a short content hash used to bust browser caches when it changes."""
+    with open(STYLESHEET_FILE, encoding="utf-8") as f:
+        css = f.read()
+    return css, hashlib.sha1(css.encode()).hexdigest()[:12]
+
+def inject_styles():
+    """Link the static stylesheet, which the browser fetches once and caches; inline it if static serving is off."""
+    css, version = _stylesheet()
+    if st.get_option("server.enableStaticServing"):
+        st.markdown(f'<link rel="stylesheet" href="app/static/styles.css?v={version}">', unsafe_allow_html=True)
+    else:
+        st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
 
 # --------------------
 # MAIN APP
@@ -364,75 +1248,10 @@ def display_tournament_data():
 def main():
     st.set_page_config(page_title="RHL 2025 Tournament Scheduler", layout="wide", initial_sidebar_state="expanded")
     
-    # Custom CSS with dark mode support and improved bracket styling
-    st.markdown("""
-    <style>
-    /* Global Styles */
-    body { font-family: 'Segoe UI', sans-serif; }
-    .main-title {
-        font-size: 48px;
-        text-align: center;
-        background: linear-gradient(90deg, #1e3c72, #2a5298);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        margin-top: 20px;
-    }
-    .section-header { color: #2c3e50; text-align: center; margin-top: 20px; }
-    /* Sidebar customization */
-    [data-testid="stSidebar"] { background: #f4f6f9; }
-    .sidebar .sidebar-content { color: #2c3e50; }
-    .stButton>button {
-        background: #e74c3c;
-        color: white;
-        border-radius: 8px;
-        padding: 10px 20px;
-        font-size: 16px;
-    }
-    .stButton>button:hover { background: #c0392b; }
-    .admin-panel {
-        background: #34495e;
-        padding: 20px;
-        border-radius: 10px;
-        color: white;
-        margin-bottom: 20px;
-    }
-    /* Bracket styling */
-    .bracket-title { font-size: 24px; font-weight: bold; text-align: center; margin: 20px 0; }
-    .bracket-container { display: flex; justify-content: space-around; flex-wrap: wrap; margin: 20px auto; }
-    .bracket-round { flex: 1; min-width: 180px; margin: 10px; padding: 10px; background: #f9f9f9; border-radius: 8px; }
-    .round-title { font-size: 18px; font-weight: bold; text-align: center; margin-bottom: 10px; }
-    .bracket-match { background: white; border: 2px solid #3498db; border-radius: 5px; margin: 10px auto; padding: 8px; text-align: center; }
-    .match-teams { font-weight: 600; margin-bottom: 5px; }
-    .match-score { color: #e74c3c; }
-    /* Table styling for light mode */
-    .stDataFrame table td, .stDataFrame table th {
-        background-color: #f9f9f9 !important;
-        color: #000 !important;
-        text-align: center !important;
-    }
-    /* Dark mode overrides */
-    @media (prefers-color-scheme: dark) {
-        body { background-color: #121212; color: #e0e0e0; }
-        .main-title { color: #e0e0e0; }
-        .section-header { color: #e0e0e0; }
-        [data-testid="stSidebar"] { background: #1e1e1e; }
-        .sidebar .sidebar-content { color: #e0e0e0; }
-        .admin-panel { background: #2c2c2c; }
-        .bracket-round { background: #2c2c2c; }
-        .bracket-match {
-            background: #1e1e1e;
-            border: 2px solid #3498db;
-            color: #e0e0e0;
-        }
-        .round-title { color: #e0e0e0; }
-        .stDataFrame table td, .stDataFrame table th {
-            background-color: #2c2c2c !important;
-            color: #e0e0e0 !important;
-        }
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    inject_styles()
     
+    select_tournament()
+
     if "logged_in" not in st.session_state:
         st.session_state.logged_in = False
         st.session_state.is_admin = False
@@ -446,6 +1265,7 @@ def main():
             if check_login(username, password):
                 st.session_state.logged_in = True
                 st.session_state.is_admin = True
+                st.session_state.username = username
                 st.rerun()
             else:
                 st.sidebar.error("Invalid credentials")
@@ -458,7 +1278,7 @@ def main():
     st.sidebar.title("Navigation")
     menu_options = ["Dashboard"]
     if st.session_state.is_admin:
-        menu_options.append("Admin Panel")
+        menu_options += ["Admin Panel", "Performance"]
     menu_options.append("Logout")
     choice = st.sidebar.radio("Menu", menu_options)
     
@@ -470,30 +1290,15 @@ def main():
     st.markdown('<h1 class="main-title">RHL 2025 Tournament Scheduler</h1>', unsafe_allow_html=True)
     st.markdown("<hr>", unsafe_allow_html=True)
     
-    if choice == "Dashboard":
-        display_tournament_data()
-    elif choice == "Admin Panel" and st.session_state.is_admin:
-        st.markdown('<div class="admin-panel">', unsafe_allow_html=True)
-        st.header("Admin Control Panel")
-        full_schedule, scores, group_stage_complete = load_full_schedule()
-        merged = full_schedule.merge(scores, on="match", how="left")
-        pending_matches = merged[merged["score"].isna()]["match"].tolist()
-        all_matches = full_schedule["match"].tolist()
-        mode = st.radio("Mode", ["Add New Score", "Edit Old Score"], horizontal=True)
-        if mode == "Add New Score":
-            match = st.selectbox("Select Pending Match", pending_matches, key="match_select_pending")
-        else:
-            match = st.selectbox("Select Match to Edit", all_matches, key="match_select_all")
-        match_teams = full_schedule[full_schedule["match"] == match]["teams"].values[0]
-        st.write(f"Selected: **{match_teams}**")
-        score_row = scores[scores["match"] == match]["score"].values
-        current_score = score_row[0] if (len(score_row) > 0 and pd.notna(score_row[0])) else ""
-        score = st.text_input("Enter Score (e.g., 2-1)", value=current_score, key="score_input_field")
-        if st.button("Update Score"):
-            update_score(match, score)
-            st.success(f"Score updated for Match {match}!")
-            st.rerun()
-        st.markdown('</div>', unsafe_allow_html=True)
+    if choice == "Performance" and st.session_state.is_admin:
+        display_performance_panel()
+    else:
+        with profiler.trace(choice), timings.stage(f"rerun: {choice}"):
+            if choice == "Dashboard":
+                live_updates()
+                display_tournament_data()
+            elif choice == "Admin Panel" and st.session_state.is_admin:
+                display_admin_panel()
 
     if st.button("Refresh Data"):
         st.rerun()
@@ -0,0 +1,546 @@
+"""
+Benchmarks for the tournament data hot paths.
+
+Run with:  python benchmark.py [standings] [scheduler] [pipeline] [load] [startup] [tiebreakers]
+                              [--sizes 12 1000 100000]
+
+"pipeline" reports latency percentiles for each step of building the schedule, on events
+of growing size. "load" drives the real app headlessly with Streamlit's AppTest: N guest
+sessions refreshing the dashboard while an admin submits scores, all at the same time.
+"startup" measures what a new spectator costs: time and bytes sent for the first paint
+(login page) and the first dashboard render, in a warm process and in a fresh one.
+"tiebreakers" times head-to-head ranking on large, tie-heavy groups and a cross-group
+ranking of every third-placed team; test_tiebreakers.py checks the orders themselves.
+Pass --history bench_history.jsonl to append the results (tagged with the git commit) and
+compare them with the previous run; the exit status is 1 if anything got slower than
+--max-regression.
+"""
+import argparse
+import concurrent.futures
+import contextlib
+import glob
+import itertools
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+import app
+
+# Every module (so the scratch copy cannot miss one the app imports) plus the event config and assets
+APP_FILES = sorted(glob.glob("*.py", root_dir=os.path.dirname(os.path.abspath(__file__)))) + [
+    "tournament.json", "static/styles.css", ".streamlit/config.toml"]
+
+
+# --------------------
+# SYNTHETIC DATA
+# --------------------
+def synthetic_tournament(n_matches, group_size=4, seed=0, max_goals=5):
+    """Round-robin groups of ``group_size`` teams, truncated to ``n_matches`` fully scored fixtures."""
+    rng = random.Random(seed)
+    per_group = group_size * (group_size - 1) // 2
+    n_groups = -(-n_matches // per_group)
+    team_list, rows = [], []
+    for g in range(n_groups):
+        group = f"G{g + 1}"
+        codes = [f"{group}T{i + 1}" for i in range(group_size)]
+        team_list += [{"name": f"Team {code}", "group": group, "code": code} for code in codes]
+        for t1, t2 in itertools.combinations(codes, 2):
+            if len(rows) < n_matches:
+                rows.append((len(rows) + 1, f"{t1} vs {t2}", group))
+    group_schedule = pd.DataFrame(rows, columns=["match", "teams", "group"])
+    group_schedule["start_time"] = "08:00:00"
+    group_schedule["end_time"] = "08:12:00"
+    scores = pd.DataFrame({
+        "match": group_schedule["match"],
+        "score": [f"{rng.randint(0, max_goals)}-{rng.randint(0, max_goals)}" for _ in range(len(group_schedule))],
+    })
+    return team_list, group_schedule, scores
+
+
+def synthetic_config(n_teams, n_groups, pitches):
+    """Tournament config with ``n_groups`` equal groups feeding Cup (1st/2nd) and Plate (3rd/4th) brackets."""
+    per_group = n_teams // n_groups
+    teams = [{"name": f"Team G{g + 1}T{i + 1}", "group": f"G{g + 1}", "code": f"G{g + 1}T{i + 1}"}
+             for g in range(n_groups) for i in range(per_group)]
+    brackets = [{"name": "Cup", "positions": [1, 2]}]
+    if per_group >= 4:
+        brackets.append({"name": "Plate", "positions": [3, 4]})
+    config = {"start_time": "08:00:00", "match_minutes": 12, "final_minutes": 17, "gap_minutes": 3,
+              "rest_minutes": 12, "pitches": pitches, "teams": teams, "brackets": brackets}
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(config, f)
+    try:
+        return app.load_tournament_config(f.name)
+    finally:
+        os.unlink(f.name)
+
+
+# --------------------
+# REFERENCE (PRE-VECTORIZATION) IMPLEMENTATIONS
+# --------------------
+def legacy_group_standings(group_schedule, scores, team_list):
+    standings = {}
+    for group in group_schedule["group"].unique():
+        group_matches = group_schedule[group_schedule["group"] == group]
+        teams_in_group = [t["code"] for t in team_list if t["group"] == group]
+        standings[group] = {team: {"points": 0, "wins": 0, "losses": 0, "gf": 0, "ga": 0}
+                            for team in teams_in_group}
+        for _, row in group_matches.iterrows():
+            score_val = scores[scores["match"] == row["match"]]["score"].values
+            if len(score_val) > 0 and pd.notna(score_val[0]):
+                t1, t2 = row["teams"].split(" vs ")
+                try:
+                    s1, s2 = map(int, score_val[0].split("-"))
+                except ValueError:
+                    continue
+                standings[group][t1]["gf"] += s1
+                standings[group][t1]["ga"] += s2
+                standings[group][t2]["gf"] += s2
+                standings[group][t2]["ga"] += s1
+                if s1 > s2:
+                    standings[group][t1]["points"] += 3
+                    standings[group][t1]["wins"] += 1
+                    standings[group][t2]["losses"] += 1
+                elif s2 > s1:
+                    standings[group][t2]["points"] += 3
+                    standings[group][t2]["wins"] += 1
+                    standings[group][t1]["losses"] += 1
+                else:
+                    standings[group][t1]["points"] += 1
+                    standings[group][t2]["points"] += 1
+    for group in standings:
+        standings[group] = sorted(standings[group].items(),
+                                  key=lambda x: (x[1]["points"], x[1]["gf"] - x[1]["ga"], x[1]["gf"]),
+                                  reverse=True)
+    return standings
+
+
+def legacy_group_stage_complete(group_schedule, scores):
+    for _, row in group_schedule.iterrows():
+        score_val = scores[scores["match"] == row["match"]]["score"].values
+        if len(score_val) == 0 or pd.isna(score_val[0]):
+            return False
+    return True
+
+
+# --------------------
+# RUNNER
+# --------------------
+def best_of(func, repeat):
+    """Best wall time in seconds over ``repeat`` calls, plus the last result."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def timings(func, repeat):
+    """Wall time in seconds of each of ``repeat`` calls."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def percentiles(samples):
+    """p50/p95/p99/max of a list of latencies in seconds."""
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {"p50": p50, "p95": p95, "p99": p99, "max": max(samples)}
+
+
+def _print_latencies(label, stats, width=28):
+    print(f"{label:<{width}} " + " ".join(f"{stats[k] * 1e3:>9.1f}ms" for k in ("p50", "p95", "p99", "max")))
+
+
+def bench_standings(sizes, legacy_max, repeat):
+    results = {}
+    print(f"{'matches':>8} {'legacy standings':>17} {'vectorized':>11} {'speedup':>8} "
+          f"{'legacy complete':>16} {'vectorized':>11}")
+    for n in sizes:
+        team_list, group_schedule, scores = synthetic_tournament(n)
+        new_t, new_result = best_of(lambda: app.calculate_group_standings(group_schedule, scores, team_list), repeat)
+        new_c, _ = best_of(lambda: app.group_stage_is_complete(group_schedule, scores), repeat)
+        results[f"standings/{n}/standings"], results[f"standings/{n}/complete"] = new_t, new_c
+        if n <= legacy_max:
+            old_t, old_result = best_of(lambda: legacy_group_standings(group_schedule, scores, team_list), 1)
+            old_c, _ = best_of(lambda: legacy_group_stage_complete(group_schedule, scores), 1)
+            assert old_result == new_result, f"standings differ at {n} matches"
+            print(f"{n:>8} {old_t * 1e3:>15.1f}ms {new_t * 1e3:>9.1f}ms {old_t / new_t:>7.0f}x "
+                  f"{old_c * 1e3:>14.1f}ms {new_c * 1e3:>9.1f}ms")
+        else:
+            print(f"{n:>8} {'skipped':>17} {new_t * 1e3:>9.1f}ms {'':>8} {'skipped':>16} {new_c * 1e3:>9.1f}ms")
+    return results
+
+
+def _day_schedule(config):
+    """Group stage plus every knockout bracket for ``config``, as the app would build it."""
+    group_schedule = app.generate_group_schedule(config)
+    scores = pd.DataFrame({"match": group_schedule["match"], "score": "1-0"})
+    standings = app.calculate_group_standings(group_schedule, scores, config["teams"])
+    knockouts = app.generate_knockout_brackets(
+        standings, group_schedule["end_time"].max(), config,
+        next_match=len(group_schedule) + 1, team_ready=app.team_availability(group_schedule, config))
+    return group_schedule, knockouts
+
+
+def _lower_bound(schedule, config):
+    """Makespan lower bound from pitch time alone (ignores bracket dependencies and team rest)."""
+    durations = [app._seconds(e) - app._seconds(s) for s, e in zip(schedule["start_time"], schedule["end_time"])]
+    return app._seconds(schedule["start_time"].min()) + sum(durations) / config["pitches"] \
+        + (len(durations) / config["pitches"] - 1) * config["gap_minutes"] * 60
+
+
+def bench_scheduler(repeat):
+    results = {}
+    cases = [("RHL 12 teams", app.tournament_config),
+             ("64 teams, 16 groups", synthetic_config(64, 16, 6)),
+             ("128 teams, 16 groups", synthetic_config(128, 16, 8))]
+    print(f"{'event':<22} {'pitches':>7} {'matches':>7} {'schedule time':>14} {'finishes':>9} {'lower bound':>12}")
+    for label, config in cases:
+        elapsed, (group_schedule, knockouts) = best_of(lambda: _day_schedule(config), repeat)
+        schedule = pd.concat([group_schedule, knockouts], ignore_index=True)
+        print(f"{label:<22} {config['pitches']:>7} {len(schedule):>7} {elapsed * 1e3:>12.1f}ms "
+              f"{schedule['end_time'].max():>9} {app._clock(_lower_bound(schedule, config)):>12}")
+        results[f"scheduler/{label}"] = elapsed
+    return results
+
+
+def _played_out(config, seed=0):
+    """Group schedule, full schedule and scores for ``config`` with every match (knockouts too) decided."""
+    rng = random.Random(seed)
+    group_schedule, knockouts = _day_schedule(config)
+    full_schedule = pd.concat([group_schedule, knockouts], ignore_index=True)
+    scores = pd.DataFrame({
+        "match": full_schedule["match"],
+        "score": [f"{rng.randint(0, 4)}-{rng.randint(0, 4)}" if group in group_schedule["group"].values
+                  else f"{rng.randint(1, 4)}-0" for group in full_schedule["group"]],
+    })
+    return group_schedule, full_schedule, scores
+
+
+def _time_load_full_schedule(repeat):
+    """load_full_schedule() on the real event config, reading a fully scored day from a scratch directory."""
+    group_schedule, _, scores = _played_out(app.tournament_config)
+    cwd, workdir = os.getcwd(), tempfile.mkdtemp(prefix="rhl-bench-")
+    try:
+        os.chdir(workdir)
+        group_schedule.to_csv(app.GROUP_SCHEDULE_FILE, index=False)
+        app.get_score_store().upsert_many(zip(scores["match"].tolist(), scores["score"].tolist()))
+        return timings(app.load_full_schedule, repeat)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def bench_pipeline(repeat):
+    """Latency percentiles of each step load_full_schedule() performs, from a 12-team day to a 256-team one."""
+    results = {}
+    cases = [("RHL 12 teams", app.tournament_config),
+             ("64 teams", synthetic_config(64, 16, 6)),
+             ("256 teams", synthetic_config(256, 64, 16))]
+    repeat = max(repeat, 20)
+    print(f"{'step':<28} {'p50':>11} {'p95':>11} {'p99':>11} {'max':>11}")
+    for label, config in cases:
+        group_schedule, full_schedule, scores = _played_out(config)
+        print(f"-- {label}: {len(full_schedule)} matches")
+        team_list = config["teams"]
+        standings = app.calculate_group_standings(group_schedule, scores, team_list)
+        steps = {
+            "calculate_group_standings": lambda: app.calculate_group_standings(group_schedule, scores, team_list),
+            "group_stage_is_complete": lambda: app.group_stage_is_complete(group_schedule, scores),
+            "generate_knockout_brackets": lambda: app.generate_knockout_brackets(
+                standings, group_schedule["end_time"].max(), config, next_match=len(group_schedule) + 1,
+                team_ready=app.team_availability(group_schedule, config)),
+            "resolve_knockout_teams": lambda: app.resolve_knockout_teams(full_schedule, scores),
+            "replace_codes_with_names": lambda: full_schedule["teams"].apply(app.replace_codes_with_names),
+        }
+        samples = {step: timings(func, repeat) for step, func in steps.items()}
+        if config is app.tournament_config:
+            samples["load_full_schedule"] = _time_load_full_schedule(repeat)
+        for step, step_samples in samples.items():
+            stats = percentiles(step_samples)
+            _print_latencies(step, stats)
+            results.update({f"pipeline/{label}/{step}/{k}": v for k, v in stats.items() if k != "max"})
+    return results
+
+
+# --------------------
+# LOAD HARNESS
+# --------------------
+def _app_workdir():
+    """Scratch copy of the app with the real event config and no scores yet."""
+    workdir = tempfile.mkdtemp(prefix="rhl-load-")
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in APP_FILES:
+        if os.path.exists(os.path.join(here, name)):
+            os.makedirs(os.path.join(workdir, os.path.dirname(name)), exist_ok=True)
+            shutil.copy(os.path.join(here, name), os.path.join(workdir, name))
+    return workdir
+
+
+def _check(at):
+    if at.exception:
+        raise RuntimeError(f"app raised during load test: {at.exception[0].value}")
+    return at
+
+
+def _guest_session(script, refreshes):
+    """One spectator: open the dashboard as a guest and rerun it ``refreshes`` times; returns render latencies."""
+    from streamlit.testing.v1 import AppTest
+    os.chdir(os.path.dirname(script))
+    at = _check(AppTest.from_file(script, default_timeout=120).run())
+    at.sidebar.button[1].click()
+    latencies = []
+    for _ in range(refreshes + 1):
+        start = time.perf_counter()
+        _check(at.run())
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _admin_session(script, writes):
+    """One scorer: log in and submit ``writes`` group-stage results through the admin panel; returns latencies."""
+    from streamlit.testing.v1 import AppTest
+    os.chdir(os.path.dirname(script))
+    at = _check(AppTest.from_file(script, default_timeout=120).run())
+    at.sidebar.text_input[0].input(app.ADMIN_USERNAME)
+    at.sidebar.text_input[1].input(app.ADMIN_PASSWORD)
+    _check(at.sidebar.button[0].click().run())
+    _check(at.sidebar.radio[0].set_value("Admin Panel").run())
+    rng = random.Random(1)
+    latencies = []
+    for match in range(1, writes + 1):
+        at.selectbox(key="match_select_pending").set_value(match)
+        at.text_input(key="score_input_field").input(f"{rng.randint(0, 4)}-{rng.randint(0, 4)}")
+        start = time.perf_counter()
+        _check(at.button[0].click().run())
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def bench_load(sessions, refreshes, writes):
+    """
+    ``sessions`` concurrent guests refreshing the dashboard while one admin submits ``writes`` scores.
+    AppTest swaps process-global runtime state on every run, so each session gets its own process;
+    they share the data files (and so the score store's cross-process locking), like app replicas.
+    """
+    workdir = _app_workdir()
+    script = os.path.join(workdir, "app.py")
+    try:
+        start = time.perf_counter()
+        with concurrent.futures.ProcessPoolExecutor(max_workers=sessions + 1) as pool:
+            guests = [pool.submit(_guest_session, script, refreshes) for _ in range(sessions)]
+            admin = pool.submit(_admin_session, script, writes).result()
+            guest = [latency for future in guests for latency in future.result()]
+        elapsed = time.perf_counter() - start
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(f"{sessions} guests x {refreshes + 1} renders, 1 admin x {writes} submissions in {elapsed:.1f}s "
+          f"({len(guest) / elapsed:.1f} renders/s)")
+    print(f"{'':<28} {'p50':>11} {'p95':>11} {'p99':>11} {'max':>11}")
+    results = {}
+    for label, samples in (("guest dashboard render", guest), ("admin score submission", admin)):
+        if samples:
+            stats = percentiles(samples)
+            _print_latencies(label, stats)
+            results.update({f"load/{sessions} sessions/{label}/{k}": v for k, v in stats.items() if k != "max"})
+    return results
+
+
+# --------------------
+# COLD START
+# --------------------
+@contextlib.contextmanager
+def _rerun_bytes():
+    """Record the serialized size of the messages each AppTest rerun sends to the browser."""
+    from streamlit.testing.v1 import local_script_runner
+    parse = local_script_runner.parse_tree_from_messages
+    sizes = []
+
+    def recording_parse(messages):
+        sizes.append(sum(m.ByteSize() for m in messages))
+        return parse(messages)
+    local_script_runner.parse_tree_from_messages = recording_parse
+    try:
+        yield sizes
+    finally:
+        local_script_runner.parse_tree_from_messages = parse
+
+
+def _spectator_session(script):
+    """A new guest: first paint (login page), then the first dashboard render. Returns [(seconds, bytes)] * 2."""
+    from streamlit.testing.v1 import AppTest
+    with _rerun_bytes() as sizes:
+        at = AppTest.from_file(script, default_timeout=120)
+        start = time.perf_counter()
+        _check(at.run())
+        first_paint = time.perf_counter() - start
+        at.sidebar.button[1].click()
+        start = time.perf_counter()
+        _check(at.run())
+        dashboard = time.perf_counter() - start
+    return [(first_paint, sizes[0]), (dashboard, sizes[1])]
+
+
+def _cold_session(workdir):
+    """The first spectator of a freshly started server: the app's own imports happen inside this session."""
+    # Not via _spectator_session: importing this module would import app (and pandas) ahead of the session
+    code = ("import json, os, sys, time; from streamlit.testing.v1 import AppTest; "
+            "os.chdir(sys.argv[1]); at = AppTest.from_file(os.path.join(sys.argv[1], 'app.py'), default_timeout=120); "
+            "start = time.perf_counter(); at.run(); "
+            "print(json.dumps([time.perf_counter() - start, 'pandas' in sys.modules, "
+            "[str(e.value) for e in at.exception]]))")
+    result = subprocess.run([sys.executable, "-c", code, workdir], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])  # [seconds, whether pandas got imported, app exceptions]
+
+
+def bench_startup(sessions):
+    """First-paint and first-dashboard time and bytes for ``sessions`` new spectators, plus a cold first session."""
+    cwd, workdir = os.getcwd(), _app_workdir()
+    try:
+        cold, pandas_imported, errors = _cold_session(workdir)
+        if errors:
+            raise RuntimeError(f"app raised during cold start: {errors[0]}")
+        os.chdir(workdir)
+        _spectator_session(os.path.join(workdir, "app.py"))  # warm the process-wide caches
+        runs = [_spectator_session(os.path.join(workdir, "app.py")) for _ in range(sessions)]
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(f"first paint of the first session after server start: {cold * 1e3:.0f}ms"
+          f" (pandas {'imported' if pandas_imported else 'not imported'})")
+    print(f"{'new spectator session':<28} {'p50':>11} {'p95':>11} {'p99':>11} {'max':>11} {'bytes':>9}")
+    results = {"startup/cold first paint": cold}
+    for i, label in enumerate(("first paint (login page)", "first dashboard render")):
+        stats = percentiles([run[i][0] for run in runs])
+        sent = int(np.median([run[i][1] for run in runs]))
+        print(f"{label:<28} " + " ".join(f"{stats[k] * 1e3:>9.1f}ms" for k in ("p50", "p95", "p99", "max"))
+              + f" {sent:>9,}")
+        results.update({f"startup/{label}/{k}": v for k, v in stats.items() if k != "max"})
+    return results
+
+
+# --------------------
+# TIEBREAKERS
+# --------------------
+FIFA_TIEBREAKERS = ["points", "head_to_head", "goal_difference", "goals_for", "fair_play", "lots"]
+
+
+def bench_tiebreakers(repeat):
+    """Ranking cost per rule set; test_tiebreakers.py checks the orders themselves."""
+    out = {}
+    print(f"{'group size':>10} {'matches':>8} {'points/gd/gf':>13} {'FIFA rules':>11} {'best thirds':>12}")
+    for group_size in (4, 16, 64):
+        # 0-1 goals per side, so points ties (and head-to-head work) are common
+        team_list, group_schedule, scores = synthetic_tournament(20000, group_size, max_goals=1)
+        configs = {rules: {"teams": team_list, "tiebreakers": tiebreakers, "lots_seed": 0}
+                   for rules, tiebreakers in (("default", app.DEFAULT_TIEBREAKERS), ("fifa", FIFA_TIEBREAKERS))}
+        for rules, config in configs.items():
+            engine = app.StandingsEngine(group_schedule, team_list, config).load(scores)
+
+            def rank(engine=engine):
+                engine._sorted = {}
+                return engine.standings()
+            out[f"tiebreakers/{group_size}/{rules}"], standings = best_of(rank, repeat)
+        thirds = [ranking[2][0] for ranking in standings.values() if len(ranking) > 2]
+        out[f"tiebreakers/{group_size}/best thirds"], _ = best_of(
+            lambda: app.rank_across_groups(thirds, standings, configs["fifa"]), repeat)
+        print(f"{group_size:>10} {len(group_schedule):>8} " + " ".join(
+            f"{out[f'tiebreakers/{group_size}/{k}'] * 1e3:>{w}.1f}ms"
+            for k, w in (("default", 11), ("fifa", 9), ("best thirds", 10))))
+    return out
+
+
+# --------------------
+# REGRESSION HISTORY
+# --------------------
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_with_history(file, results, max_regression):
+    """Print every metric slower than the last recorded run by more than ``max_regression``; returns their count."""
+    try:
+        with open(file, encoding="utf-8") as f:
+            previous = [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        previous = []
+    if not previous:
+        print(f"\nNo earlier runs in {file} to compare with.")
+        return 0
+    last = previous[-1]
+    regressions = [(key, last["results"][key], value) for key, value in results.items()
+                   if last["results"].get(key) and value > last["results"][key] * (1 + max_regression)]
+    print(f"\n== compared with {last['commit'] or 'uncommitted'} ({last['date']}) ==")
+    for key, old, new in regressions:
+        print(f"REGRESSION {key}: {old * 1e3:.1f}ms -> {new * 1e3:.1f}ms ({new / old - 1:+.0%})")
+    if not regressions:
+        print(f"no metric slower by more than {max_regression:.0%}")
+    return len(regressions)
+
+
+def record_history(file, results):
+    entry = {"commit": _git_commit(), "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+             "results": results}
+    with open(file, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+SUITES = {
+    "standings": lambda args: bench_standings(args.sizes, args.legacy_max, args.repeat),
+    "scheduler": lambda args: bench_scheduler(args.repeat),
+    "pipeline": lambda args: bench_pipeline(args.repeat),
+    "load": lambda args: bench_load(args.sessions, args.refreshes, args.writes),
+    "startup": lambda args: bench_startup(args.sessions),
+    "tiebreakers": lambda args: bench_tiebreakers(args.repeat),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[12, 1000, 100000],
+                        help="numbers of group matches to benchmark")
+    parser.add_argument("--legacy-max", type=int, default=1000,
+                        help="largest size to run the quadratic per-row implementation on")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--sessions", type=int, default=8,
+                        help="concurrent guest sessions in the load test, new sessions in the startup test")
+    parser.add_argument("--refreshes", type=int, default=5, help="dashboard reruns per guest session")
+    parser.add_argument("--writes", type=int, default=12, help="scores the admin submits during the load test")
+    parser.add_argument("--history", metavar="FILE", help="append results to this JSONL file and compare with the last run")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="slowdown (fraction) versus the last recorded run that counts as a regression")
+    parser.add_argument("suites", nargs="*", metavar="suite", help=f"suites to run: {', '.join(SUITES)} (default: all)")
+    args = parser.parse_args()
+    unknown = set(args.suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(sorted(unknown))}")
+    results = {}
+    for name in args.suites or SUITES:
+        print(f"\n== {name} ==")
+        results.update(SUITES[name](args))
+    if args.history:
+        regressions = compare_with_history(args.history, results, args.max_regression)
+        record_history(args.history, results)
+        raise SystemExit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
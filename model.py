@@ -0,0 +1,145 @@
+"""
+Typed in-memory model of a tournament: teams with integer ids, fixtures whose sides
+are split once, and results whose goals are parsed once.
+
+The CSV files, score stores and the UI keep the "A1 vs A2" and "2-1" strings; they
+are turned into these records at the edge, and the standings, bracket and rendering
+code work on ids and goals from there on. Nothing here imports pandas or NumPy.
+"""
+from collections import namedtuple
+
+VS = " vs "
+
+Result = namedtuple("Result", "home away")
+Result.__doc__ = "Goals of a played match; a plain tuple, so it unpacks and compares like (s1, s2)."
+
+
+def parse_score(score):
+    """Parse a "s1-s2" score string into a Result, or None if missing or malformed."""
+    if not isinstance(score, str):
+        return None
+    try:
+        s1, s2 = map(int, score.split("-"))
+    except ValueError:
+        return None
+    return Result(s1, s2)
+
+
+def split_sides(teams_str):
+    """The two sides of a "t1 vs t2" string, or None if it is not one."""
+    sides = teams_str.split(VS) if isinstance(teams_str, str) else ()
+    return (sides[0], sides[1]) if len(sides) == 2 else None
+
+
+class Team:
+    """One entrant; ``id`` is its position in the tournament config."""
+
+    __slots__ = ("id", "code", "name", "group")
+
+    def __init__(self, id, code, name, group):
+        self.id = id
+        self.code = code
+        self.name = name
+        self.group = group
+
+    def __repr__(self):
+        return f"Team({self.id}, {self.code!r}, {self.name!r}, {self.group!r})"
+
+
+class Match:
+    """
+    A fixture. ``home`` and ``away`` are team ids when the side is a known team,
+    otherwise the side's text (a "Winner SF1" placeholder or an unknown name).
+    """
+
+    __slots__ = ("number", "home", "away", "stage")
+
+    def __init__(self, number, home, away, stage):
+        self.number = number
+        self.home = home
+        self.away = away
+        self.stage = stage
+
+    @property
+    def resolved(self):
+        """True when both sides are known teams."""
+        return isinstance(self.home, int) and isinstance(self.away, int)
+
+    def __repr__(self):
+        return f"Match({self.number}, {self.home!r}, {self.away!r}, {self.stage!r})"
+
+
+class TeamRecord:
+    """Running group-stage totals of one team."""
+
+    __slots__ = ("points", "wins", "losses", "gf", "ga")
+    FIELDS = __slots__
+
+    def __init__(self, points=0, wins=0, losses=0, gf=0, ga=0):
+        self.points = points
+        self.wins = wins
+        self.losses = losses
+        self.gf = gf
+        self.ga = ga
+
+    def apply(self, scored, conceded, sign=1):
+        """Add (``sign=1``) or remove (``sign=-1``) one result from this team's point of view."""
+        self.gf += sign * scored
+        self.ga += sign * conceded
+        if scored > conceded:
+            self.points += sign * 3
+            self.wins += sign
+        elif scored < conceded:
+            self.losses += sign
+        else:
+            self.points += sign
+
+    def as_dict(self):
+        return {"points": self.points, "wins": self.wins, "losses": self.losses, "gf": self.gf, "ga": self.ga}
+
+
+class Roster:
+    """The teams of one tournament, with O(1) lookups by id, code and name."""
+
+    __slots__ = ("teams", "ids", "names", "groups", "_display")
+
+    def __init__(self, team_list):
+        self.teams = tuple(Team(i, t["code"], t["name"], t["group"]) for i, t in enumerate(team_list))
+        self.ids = {t.name: t.id for t in self.teams}
+        self.ids.update((t.code, t.id) for t in self.teams)  # codes win over a name spelled like a code
+        self.names = {t.code: t.name for t in self.teams}
+        self.groups = {}
+        for t in self.teams:
+            self.groups.setdefault(t.group, []).append(t.id)
+        self._display = {}
+
+    def __len__(self):
+        return len(self.teams)
+
+    def team_id(self, side):
+        """Id of the team a side refers to, by code or by name; None for placeholders."""
+        return self.ids.get(side)
+
+    def name(self, side):
+        """Display name of a side: the team's name for a code, anything else unchanged."""
+        return self.names.get(side, side)
+
+    def display(self, teams_str):
+        """
+        "Name vs Name" for a "code vs code" string. Each side is looked up whole, so a
+        code never matches inside a longer one ("A1" in "A10") or inside a team name.
+        """
+        shown = self._display.get(teams_str)
+        if shown is None:
+            sides = split_sides(teams_str)
+            shown = teams_str if sides is None else f"{self.name(sides[0])}{VS}{self.name(sides[1])}"
+            self._display[teams_str] = shown
+        return shown
+
+    def match(self, number, teams_str, stage):
+        """A Match for one schedule row, with known teams resolved to ids."""
+        sides = split_sides(teams_str)
+        if sides is None:
+            return None
+        home, away = sides
+        return Match(number, self.ids.get(home, home), self.ids.get(away, away), stage)
@@ -0,0 +1,172 @@
+"""
+Opt-in timing of the app's stages, plus profiler traces of single reruns on demand.
+
+Recording is off unless RHL_PROFILE=1 is set or an admin switches it on in the
+Performance panel; while off, an instrumented call costs one attribute check.
+Timings are process-wide (every session contributes) and keep a rolling window of
+recent samples per stage. Traces are written to RHL_PROFILE_DIR (default "profiles"):
+a cProfile ``.prof`` file for every traced rerun, plus a pyinstrument HTML report when
+pyinstrument is installed.
+
+This module lives outside app.py so its state survives Streamlit re-executing the script.
+"""
+import contextlib
+import cProfile
+import functools
+import io
+import os
+import pstats
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+
+class StageTimings:
+    """Wall time and call count per named stage, with the last ``window`` samples of each."""
+
+    def __init__(self, window=500, enabled=False):
+        self.window = window
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.samples = {}
+            self.calls = {}
+            self.totals = {}
+
+    def record(self, stage, seconds):
+        with self._lock:
+            if stage not in self.samples:
+                self.samples[stage] = deque(maxlen=self.window)
+                self.calls[stage] = 0
+                self.totals[stage] = 0.0
+            self.samples[stage].append(seconds)
+            self.calls[stage] += 1
+            self.totals[stage] += seconds
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time the enclosed block as ``name`` (when recording is on)."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def timed(self, name=None):
+        """Decorator timing every call of the function as ``name`` (default: the function's name)."""
+        def decorator(func):
+            label = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(label, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def recent(self, stage):
+        """The rolling window of samples (seconds) for ``stage``, oldest first."""
+        with self._lock:
+            return list(self.samples.get(stage, ()))
+
+    def summary(self):
+        """One row per stage: total calls and time, plus mean/p50/p95/max over the rolling window (ms)."""
+        import numpy as np
+        import pandas as pd
+
+        with self._lock:
+            rows = [(stage, self.calls[stage], self.totals[stage], np.array(samples))
+                    for stage, samples in self.samples.items()]
+        columns = ["stage", "calls", "total_ms", "mean_ms", "p50_ms", "p95_ms", "max_ms", "last_ms"]
+        return pd.DataFrame([
+            (stage, calls, total * 1e3, window.mean() * 1e3, np.percentile(window, 50) * 1e3,
+             np.percentile(window, 95) * 1e3, window.max() * 1e3, window[-1] * 1e3)
+            for stage, calls, total, window in rows
+        ], columns=columns).sort_values("total_ms", ascending=False, ignore_index=True)
+
+
+class RerunProfiler:
+    """Captures a full profiler trace of the next rerun(s) someone asks for."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def request(self, reruns=1):
+        """Trace the next ``reruns`` instrumented reruns, from whichever session runs them."""
+        with self._lock:
+            self._pending += reruns
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def _take(self):
+        with self._lock:
+            if self._pending <= 0:
+                return False
+            self._pending -= 1
+            return True
+
+    @contextlib.contextmanager
+    def trace(self, label):
+        """Profile the enclosed block if a trace was requested; otherwise run it untouched."""
+        if not self._pending or not self._take():
+            yield
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        slug = re.sub(r"\W+", "-", label).strip("-")
+        base = os.path.join(self.directory, f"{datetime.now():%Y%m%d-%H%M%S-%f}-{slug}")
+        profile = cProfile.Profile()
+        html_profiler = pyinstrument.Profiler() if pyinstrument is not None else None
+        if html_profiler is not None:
+            html_profiler.start()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            profile.dump_stats(base + ".prof")
+            if html_profiler is not None:
+                html_profiler.stop()
+                with open(base + ".html", "w", encoding="utf-8") as f:
+                    f.write(html_profiler.output_html())
+
+    def traces(self):
+        """Trace files written so far, newest first."""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted((os.path.join(self.directory, n) for n in names if n.endswith((".prof", ".html"))),
+                      reverse=True)
+
+    @staticmethod
+    def top_functions(path, limit=30, sort="cumulative"):
+        """The ``limit`` most expensive functions of a .prof trace, as pstats prints them."""
+        out = io.StringIO()
+        pstats.Stats(path, stream=out).strip_dirs().sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+
+timings = StageTimings(enabled=os.environ.get("RHL_PROFILE", "") not in ("", "0"))
+profiler = RerunProfiler(os.environ.get("RHL_PROFILE_DIR", "profiles"))
@@ -0,0 +1,325 @@
+"""
+Score storage backends.
+
+Every store keeps one current score per match and exposes the same small interface:
+load(), upsert(match, score, author), upsert_many(items, author), signature(),
+export_csv(file). Every write is atomic and serialized across processes, so scorers
+at several pitches can submit at the same time without losing updates.
+The event log store additionally keeps the full history of every change.
+
+Import/export the classic scores.csv format with:
+    python score_store.py import scores.csv [--backend sqlite|eventlog] [--db scores.db] [--log score_events.jsonl]
+    python score_store.py export scores.csv [--backend sqlite|eventlog] [--db scores.db] [--log score_events.jsonl]
+"""
+import argparse
+import contextlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from signatures import file_signature
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+SCORE_COLUMNS = ["match", "score"]
+
+
+@contextlib.contextmanager
+def file_lock(path):
+    """Exclusive inter-process lock held on ``path`` (created if missing) for the duration of the block."""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _atomic_write(file, write):
+    """Call ``write(f)`` on a temp file next to ``file``, then rename it over ``file``."""
+    directory = os.path.dirname(os.path.abspath(file))
+    fd, tmp = tempfile.mkstemp(prefix=".scores-", dir=directory)
+    try:
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+            write(f)
+        os.replace(tmp, file)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp)
+        raise
+
+
+def atomic_write_csv(df, file):
+    """Write ``df`` to ``file`` via a temp file and rename, so readers never see a half-written file."""
+    _atomic_write(file, lambda f: df.to_csv(f, index=False))
+
+
+def _file_size(file):
+    try:
+        return os.path.getsize(file)
+    except FileNotFoundError:
+        return None
+
+
+class CsvScoreStore:
+    """The original scores.csv file, now rewritten atomically under a lock file."""
+
+    backend = "csv"
+
+    def __init__(self, file):
+        self.file = file
+        self.lock_file = file + ".lock"
+
+    def load(self):
+        if os.path.exists(self.file):
+            return pd.read_csv(self.file)
+        return pd.DataFrame(columns=SCORE_COLUMNS)
+
+    def signature(self):
+        return "csv", file_signature(self.file)
+
+    def upsert(self, match, score, author=None):
+        """Insert or replace one score; returns the (before, after) signatures of the write."""
+        return self.upsert_many([(match, score)], author)
+
+    def upsert_many(self, items, author=None):
+        """Insert or replace several scores in a single rewrite; returns (before, after) signatures."""
+        with file_lock(self.lock_file):
+            before = self.signature()
+            scores = self.load()
+            updates = dict(items)
+            existing = scores["match"].isin(list(updates))
+            scores["score"] = scores["score"].astype(object)  # an all-empty column reads back as float
+            scores.loc[existing, "score"] = scores.loc[existing, "match"].map(updates)
+            present = set(scores.loc[existing, "match"].tolist())
+            added = [(match, score) for match, score in updates.items() if match not in present]
+            if added:
+                scores = pd.concat([scores, pd.DataFrame(added, columns=SCORE_COLUMNS)], ignore_index=True)
+            atomic_write_csv(scores, self.file)
+            return before, self.signature()
+
+    def export_csv(self, file):
+        atomic_write_csv(self.load(), file)
+
+
+class SqliteScoreStore:
+    """
+    Scores in an SQLite database in WAL mode: readers never block the writer and
+    each upsert is a single-row transaction. A version counter bumped by every
+    write serves as the change signature.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, file):
+        self.file = file
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS scores (match INTEGER PRIMARY KEY, score TEXT)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO meta VALUES ('version', 0)")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.file, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout=30000")
+        return contextlib.closing(conn)
+
+    def load(self):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT match, score FROM scores ORDER BY match").fetchall()
+        return pd.DataFrame(rows, columns=SCORE_COLUMNS)
+
+    def _version(self, conn):
+        return conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    def signature(self):
+        with self._connect() as conn:
+            return "sqlite", self._version(conn)
+
+    def upsert(self, match, score, author=None):
+        """Insert or replace one score; returns the (before, after) signatures of the write."""
+        return self.upsert_many([(match, score)], author)
+
+    def upsert_many(self, items, author=None):
+        """Insert or replace several scores in one transaction; returns (before, after) signatures."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                version = self._version(conn)
+                conn.executemany(
+                    "INSERT INTO scores (match, score) VALUES (?, ?) "
+                    "ON CONFLICT(match) DO UPDATE SET score = excluded.score",
+                    [(int(match), None if pd.isna(score) else str(score)) for match, score in items])
+                conn.execute("UPDATE meta SET value = ? WHERE key = 'version'", (version + 1,))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return ("sqlite", version), ("sqlite", version + 1)
+
+    def import_csv(self, file):
+        """Load every row of a scores.csv file (first row wins for duplicated matches)."""
+        scores = pd.read_csv(file).drop_duplicates("match", keep="first")
+        return self.upsert_many(zip(scores["match"].tolist(), scores["score"].tolist()))
+
+    def export_csv(self, file):
+        atomic_write_csv(self.load(), file)
+
+
+class EventLogScoreStore:
+    """
+    Append-only log of score changes, one JSON line per event:
+    {"match": 5, "score": "2-1", "ts": "2025-...Z", "author": "admin"}.
+
+    The log is never rewritten, so it doubles as the audit trail for disputed results.
+    Readers keep the current scores in memory and only parse the bytes appended since
+    their last read (see ``tail``). Every ``snapshot_every`` events the writer saves a
+    snapshot of the current scores with the log offset it covers, so a fresh reader
+    replays the snapshot plus a short tail instead of the whole log.
+    """
+
+    backend = "eventlog"
+
+    def __init__(self, file, snapshot_file=None, snapshot_every=200):
+        self.file = file
+        self.snapshot_file = snapshot_file or os.path.splitext(file)[0] + ".snapshot.json"
+        self.lock_file = file + ".lock"
+        self.snapshot_every = snapshot_every
+        self._lock = threading.Lock()
+        self._scores = None
+        self._offset = 0
+        self._events_since_snapshot = 0
+
+    def tail(self, offset):
+        """Events appended after byte ``offset``; returns (events, new_offset). Partial lines are left for later."""
+        try:
+            with open(self.file, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], 0
+        end = data.rfind(b"\n") + 1
+        events = [json.loads(line) for line in data[:end].splitlines() if line.strip()]
+        return events, offset + end
+
+    def _read_snapshot(self):
+        try:
+            with open(self.snapshot_file, encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return {}, 0
+        return {match: score for match, score in snapshot["scores"]}, snapshot["offset"]
+
+    def _refresh(self):
+        """Bring the in-memory scores up to date with the log; caller holds ``self._lock``."""
+        size = _file_size(self.file)
+        if self._scores is None or size is None or size < self._offset:
+            self._scores, self._offset = self._read_snapshot()
+            self._events_since_snapshot = 0
+        events, self._offset = self.tail(self._offset)
+        for event in events:
+            self._scores[event["match"]] = event["score"]
+        self._events_since_snapshot += len(events)
+
+    def load(self):
+        with self._lock:
+            self._refresh()
+            return pd.DataFrame(list(self._scores.items()), columns=SCORE_COLUMNS)
+
+    def signature(self):
+        # The log is append-only, so its size changes with every write
+        return "eventlog", _file_size(self.file)
+
+    def upsert(self, match, score, author=None):
+        """Append one score change; returns the (before, after) signatures of the write."""
+        return self.upsert_many([(match, score)], author)
+
+    def upsert_many(self, items, author=None):
+        """Append several score changes in a single write; returns (before, after) signatures."""
+        ts = datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+        lines = "".join(
+            json.dumps({"match": int(match), "score": None if pd.isna(score) else str(score),
+                        "ts": ts, "author": author}) + "\n"
+            for match, score in items)
+        with file_lock(self.lock_file), self._lock:
+            before = self.signature()
+            with open(self.file, "a", encoding="utf-8") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            after = self.signature()
+            self._refresh()
+            if self._events_since_snapshot >= self.snapshot_every:
+                self._write_snapshot()
+        return before, after
+
+    def _write_snapshot(self):
+        snapshot = {"offset": self._offset, "scores": list(self._scores.items())}
+        _atomic_write(self.snapshot_file, lambda f: json.dump(snapshot, f))
+        self._events_since_snapshot = 0
+
+    def history(self, match=None):
+        """Every recorded event, oldest first, optionally only for one match."""
+        events, _ = self.tail(0)
+        return [e for e in events if match is None or e["match"] == match]
+
+    def import_csv(self, file):
+        """Record every row of a scores.csv file as an event (first row wins for duplicated matches)."""
+        scores = pd.read_csv(file).drop_duplicates("match", keep="first")
+        return self.upsert_many(zip(scores["match"].tolist(), scores["score"].tolist()), author="import")
+
+    def export_csv(self, file):
+        atomic_write_csv(self.load(), file)
+
+
+def open_score_store(backend, csv_file, db_file, log_file=None):
+    """Score store for ``backend`` ("csv", "sqlite" or "eventlog")."""
+    if backend == "csv":
+        return CsvScoreStore(csv_file)
+    if backend == "sqlite":
+        return SqliteScoreStore(db_file)
+    if backend == "eventlog":
+        return EventLogScoreStore(log_file or "score_events.jsonl")
+    raise ValueError(f"Unknown score backend {backend!r}; expected 'csv', 'sqlite' or 'eventlog'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import/export scores between scores.csv and another store.")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("csv_file")
+    parser.add_argument("--backend", choices=["sqlite", "eventlog"], default="sqlite")
+    parser.add_argument("--db", default="scores.db")
+    parser.add_argument("--log", default="score_events.jsonl")
+    args = parser.parse_args()
+    store = open_score_store(args.backend, None, args.db, args.log)
+    if args.command == "import":
+        store.import_csv(args.csv_file)
+    else:
+        store.export_csv(args.csv_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Change tokens for the data files, used as cache keys by app.py and score_store.py.
+
+A file's (mtime_ns, size) alone misses a rewrite of the same size within the
+filesystem's timestamp granularity (a "2-1" corrected to "1-2" by another process),
+so the token also carries a hash of the content. The hash is memoized per
+(path, inode, mtime_ns, size), but only once the file is older than RACY_SECONDS:
+until then another same-size write could still land on the same timestamp, so a
+recently written file is re-read on every call (as git does for "racily clean" files).
+"""
+import hashlib
+import os
+import threading
+import time
+
+RACY_SECONDS = 2.0  # coarser than any timestamp granularity we expect (FAT: 2 s)
+
+_hashes = {}
+_lock = threading.Lock()
+
+
+def _content_hash(f):
+    digest = hashlib.blake2b(digest_size=16)
+    for chunk in iter(lambda: f.read(1 << 20), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_signature(file):
+    """Change token for a data file: (mtime_ns, size, content hash), or None if it does not exist."""
+    try:
+        stat = os.stat(file)
+    except FileNotFoundError:
+        return None
+    key = (os.path.abspath(file), stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        content = _hashes.get(key)
+    if content is not None:
+        return stat.st_mtime_ns, stat.st_size, content
+    try:
+        with open(file, "rb") as f:
+            stat = os.fstat(f.fileno())  # the file actually hashed, should it have been replaced meanwhile
+            content = _content_hash(f)
+    except FileNotFoundError:
+        return None
+    if time.time_ns() - stat.st_mtime_ns > RACY_SECONDS * 1e9:
+        with _lock:
+            if len(_hashes) >= 1024:
+                _hashes.clear()
+            _hashes[(key[0], stat.st_ino, stat.st_mtime_ns, stat.st_size)] = content
+    return stat.st_mtime_ns, stat.st_size, content
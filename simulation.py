@@ -0,0 +1,290 @@
+"""
+Qualification odds: simulate the rest of the tournament from the results so far.
+
+Remaining group matches are drawn from a grid of scorelines (0..max_goals each side),
+either uniformly or from a simple Poisson team-strength model. Each outcome goes
+through the same group ranking and bracket seeding as the app; knockout brackets
+are then resolved exactly with a win-probability dynamic programme, so every
+outcome contributes each team's chance of winning every bracket.
+
+When the remaining outcome space is small it is enumerated exhaustively (exact
+odds under the model); otherwise it is Monte Carlo sampled in NumPy batches,
+spread over a process pool.
+
+    python simulation.py [--sims 1000000] [--workers 8] [--model uniform|strength]
+"""
+import argparse
+import concurrent.futures
+import math
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import app
+from tiebreakers import seeded_order
+
+_KEY_BASE = 1 << 12  # goal totals/differences stay well inside this when packed into one sort key
+
+
+def _strengths(config, engine, model):
+    """Per-team strength: the config's "strength" if given, else 0.3 x goal difference per game played."""
+    strengths = np.zeros(len(engine.records))
+    if model == "uniform":
+        return strengths
+    played = np.zeros(len(engine.records), dtype=np.int64)
+    for match in engine.results:
+        fixture = engine.fixtures[match]
+        played[fixture.home] += 1
+        played[fixture.away] += 1
+    for i, (t, record) in enumerate(zip(config["teams"], engine.records)):
+        if "strength" in t:
+            strengths[i] = t["strength"]
+        else:
+            strengths[i] = 0.3 * (record.gf - record.ga) / max(played[i], 1)
+    return strengths
+
+
+def _scoreline_probabilities(strength_home, strength_away, max_goals, model, base_goals=1.3):
+    """P(home goals, away goals) over the 0..max_goals grid, flattened to length (max_goals + 1) ** 2."""
+    goals = np.arange(max_goals + 1)
+    if model == "uniform":
+        return np.full(len(goals) ** 2, 1 / len(goals) ** 2)
+    diff = strength_home - strength_away
+    lam_home, lam_away = base_goals * math.exp(diff / 2), base_goals * math.exp(-diff / 2)
+    factorial = np.array([math.factorial(g) for g in goals])
+    p_home = lam_home ** goals / factorial
+    p_away = lam_away ** goals / factorial
+    grid = np.outer(p_home / p_home.sum(), p_away / p_away.sum())
+    return grid.ravel()
+
+
+def build_model(group_schedule, scores, full_schedule=None, config=None, model="uniform", max_goals=4):
+    """
+    Everything the simulation needs as plain NumPy arrays (picklable for worker processes):
+    current group aggregates, the remaining fixtures with their scoreline distributions,
+    group membership, bracket slots and the pairwise knockout win-probability matrix.
+    """
+    config = app.tournament_config if config is None else config
+    engine = app.StandingsEngine(group_schedule, config["teams"]).load(scores)
+    roster = engine.roster
+    n_teams = len(roster)
+    base = {column: np.array([getattr(record, column) for record in engine.records], dtype=np.int64)
+            for column in ("points", "gf", "ga")}
+    remaining = [(fixture.home, fixture.away)
+                 for match, fixture in engine.fixtures.items() if match not in engine.results]
+    strengths = _strengths(config, engine, model)
+    probabilities = np.array([_scoreline_probabilities(strengths[h], strengths[a], max_goals, model)
+                              for h, a in remaining]).reshape(len(remaining), (max_goals + 1) ** 2)
+
+    beat = 1 / (1 + np.exp(-(strengths[:, None] - strengths[None, :])))
+    if full_schedule is not None:
+        # Knockout matches already played are fixed: the winner beats the loser with certainty
+        knockout_rounds = {name for bracket in config["brackets"] for name in app.bracket_round_names(bracket, config)}
+        scores_by_match = app._score_lookup(scores)
+        for number, teams_str, round_name in zip(full_schedule["match"], full_schedule["teams"], full_schedule["group"]):
+            result = app.parse_score(scores_by_match.get(number))
+            match = roster.match(number, teams_str, round_name) if round_name in knockout_rounds else None
+            if result and match is not None and match.resolved:
+                winner, loser = (match.home, match.away) if result.home > result.away else (match.away, match.home)
+                beat[winner, loser], beat[loser, winner] = 1.0, 0.0
+
+    groups = [np.array(ids, dtype=np.int64) for ids in engine.group_ids.values()]
+    group_position = {group: i for i, group in enumerate(engine.groups)}
+    brackets = []
+    for bracket in config["brackets"]:
+        if bracket.get("seeding") == "ranked":
+            # Qualifiers are ranked across groups per outcome (see _evaluate); the best
+            # bracket_size of them go through and the best meets the worst
+            slots = [(group_position[group], pos) for pos in bracket["positions"] for group in engine.groups]
+            seed_order = np.array(seeded_order(app.bracket_size(bracket, config)), dtype=np.int64)
+        else:
+            slots = [(group_position[group], pos)
+                     for group, pos in app.bracket_seed_slots(engine.groups, bracket["positions"])]
+            seed_order = None
+        brackets.append((bracket["name"], slots, seed_order))
+    return {
+        "codes": [t.code for t in roster.teams],
+        "names": [t.name for t in roster.teams],
+        "group_names": list(engine.groups),
+        "base": base,
+        "home": np.array([h for h, _ in remaining], dtype=np.int64),
+        "away": np.array([a for _, a in remaining], dtype=np.int64),
+        "probabilities": probabilities,
+        "max_goals": max_goals,
+        "groups": groups,
+        "brackets": brackets,
+        "beat": beat,
+        "n_teams": n_teams,
+    }
+
+
+def _bracket_win_probabilities(sides, beat):
+    """
+    Exact probability that each slot's team wins a single-elimination bracket.
+    ``sides`` is (outcomes, slots) team indices in bracket order; consecutive blocks merge each round.
+    """
+    n = sides.shape[1]
+    prob = np.ones(sides.shape)
+    m = 1
+    while m < n:
+        merged = np.empty_like(prob)
+        for start in range(0, n, 2 * m):
+            left, right = slice(start, start + m), slice(start + m, start + 2 * m)
+            p_left = beat[sides[:, left][:, :, None], sides[:, right][:, None, :]]
+            merged[:, left] = prob[:, left] * np.einsum("sij,sj->si", p_left, prob[:, right])
+            merged[:, right] = prob[:, right] * np.einsum("sij,si->sj", 1 - p_left, prob[:, left])
+        prob = merged
+        m *= 2
+    return prob
+
+
+def _evaluate(model, home_goals, away_goals, weights):
+    """Weighted group-position, qualification and bracket-win totals for a batch of group-stage outcomes."""
+    n_outcomes, n_teams = len(weights), model["n_teams"]
+    points = np.tile(model["base"]["points"], (n_outcomes, 1))
+    gf = np.tile(model["base"]["gf"], (n_outcomes, 1))
+    ga = np.tile(model["base"]["ga"], (n_outcomes, 1))
+    for r, (home, away) in enumerate(zip(model["home"], model["away"])):
+        g1, g2 = home_goals[:, r], away_goals[:, r]
+        points[:, home] += 3 * (g1 > g2) + (g1 == g2)
+        points[:, away] += 3 * (g2 > g1) + (g1 == g2)
+        gf[:, home] += g1
+        ga[:, home] += g2
+        gf[:, away] += g2
+        ga[:, away] += g1
+    # The default tiebreakers, (points, gd, gf) with ties keeping team order; head-to-head,
+    # fair play and lots from a config's "tiebreakers" are not simulated
+    key = (points * _KEY_BASE + (gf - ga + _KEY_BASE // 2)) * _KEY_BASE + gf
+
+    max_size = max((len(members) for members in model["groups"]), default=0)
+    positions = np.zeros((n_teams, max_size))
+    ranked = []
+    for members in model["groups"]:
+        order = members[np.argsort(-key[:, members], axis=1, kind="stable")]
+        ranked.append(order)
+        for pos in range(len(members)):
+            positions[:, pos] += np.bincount(order[:, pos], weights=weights, minlength=n_teams)
+
+    qualify, win = {}, {}
+    for name, slots, seed_order in model["brackets"]:
+        sides = np.stack([ranked[group][:, pos - 1] for group, pos in slots], axis=1)
+        if seed_order is not None:
+            best_first = np.argsort(-np.take_along_axis(key, sides, axis=1), axis=1, kind="stable")
+            sides = np.take_along_axis(sides, best_first[:, seed_order], axis=1)
+        slot_weights = np.repeat(weights, sides.shape[1])
+        qualify[name] = np.bincount(sides.ravel(), weights=slot_weights, minlength=n_teams)
+        win_prob = _bracket_win_probabilities(sides, model["beat"])
+        win[name] = np.bincount(sides.ravel(), weights=(win_prob * weights[:, None]).ravel(), minlength=n_teams)
+    return {"positions": positions, "qualify": qualify, "win": win, "weight": weights.sum()}
+
+
+def _merge(total, part):
+    if total is None:
+        return part
+    total["positions"] += part["positions"]
+    total["weight"] += part["weight"]
+    for key in ("qualify", "win"):
+        for name in total[key]:
+            total[key][name] += part[key][name]
+    return total
+
+
+def _batch_size(model):
+    """Outcomes per batch, keeping the per-batch working set around a few hundred MB."""
+    return max(1000, min(200_000, 20_000_000 // max(1, len(model["home"]) + model["n_teams"])))
+
+
+def _simulate_batch(model, n, seed):
+    """Monte Carlo batch: sample ``n`` outcomes of the remaining group matches and evaluate them."""
+    rng = np.random.default_rng(seed)
+    side = model["max_goals"] + 1
+    cdf = np.cumsum(model["probabilities"], axis=1)
+    samples = np.empty((n, len(model["home"])), dtype=np.int64)
+    for r in range(len(model["home"])):
+        samples[:, r] = np.minimum(np.searchsorted(cdf[r], rng.random(n), side="right"), side * side - 1)
+    return _evaluate(model, samples // side, samples % side, np.ones(n))
+
+
+def _enumerate(model):
+    """Exhaustive evaluation of every combination of remaining scorelines, weighted by probability."""
+    n_remaining, side = len(model["home"]), model["max_goals"] + 1
+    n_outcomes = (side * side) ** n_remaining
+    total = None
+    for start in range(0, n_outcomes, _batch_size(model)):
+        index = np.arange(start, min(start + _batch_size(model), n_outcomes))
+        digits = np.stack(np.unravel_index(index, (side * side,) * n_remaining), axis=1) if n_remaining \
+            else np.zeros((len(index), 0), dtype=np.int64)
+        weights = np.prod(model["probabilities"][np.arange(n_remaining), digits], axis=1) if n_remaining \
+            else np.ones(len(index))
+        total = _merge(total, _evaluate(model, digits // side, digits % side, weights))
+    return total
+
+
+def simulate(model, n_sims=100_000, workers=1, seed=None, exhaustive_limit=1_000_000):
+    """
+    Odds for every team as a DataFrame. Enumerates all remaining outcomes when there are at most
+    ``exhaustive_limit`` of them, otherwise runs ``n_sims`` Monte Carlo tournaments on ``workers``
+    processes (``None`` = one per CPU).
+    """
+    n_outcomes = (model["max_goals"] + 1) ** (2 * len(model["home"]))
+    if n_outcomes <= exhaustive_limit:
+        total, method = _enumerate(model), f"exhaustive ({n_outcomes:,} outcomes)"
+    else:
+        batch = _batch_size(model)
+        sizes = [batch] * (n_sims // batch) + ([n_sims % batch] if n_sims % batch else [])
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        workers = os.cpu_count() if workers is None else workers
+        if workers > 1 and len(sizes) > 1:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+                parts = pool.map(_simulate_batch, [model] * len(sizes), sizes, seeds)
+                total = None
+                for part in parts:
+                    total = _merge(total, part)
+        else:
+            total = None
+            for size, child in zip(sizes, seeds):
+                total = _merge(total, _simulate_batch(model, size, child))
+        method = f"Monte Carlo ({n_sims:,} tournaments)"
+
+    weight = total["weight"]
+    odds = pd.DataFrame({"team": model["names"], "code": model["codes"]})
+    team_group = {}
+    for name, members in zip(model["group_names"], model["groups"]):
+        for i in members.tolist():
+            team_group[i] = name
+    odds["group"] = [team_group.get(i) for i in range(model["n_teams"])]
+    for pos in range(total["positions"].shape[1]):
+        odds[f"P(pos {pos + 1})"] = total["positions"][:, pos] / weight
+    for name in total["qualify"]:
+        odds[f"P({name})"] = total["qualify"][name] / weight
+        odds[f"P(win {name})"] = total["win"][name] / weight
+    odds.attrs["method"] = method
+    return odds
+
+
+def qualification_odds(group_schedule, scores, full_schedule=None, config=None, model="uniform", **kwargs):
+    """Convenience wrapper: build the model from the current data and simulate it."""
+    return simulate(build_model(group_schedule, scores, full_schedule, config, model=model), **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate the rest of the tournament and print each team's odds.")
+    parser.add_argument("--sims", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--model", choices=["uniform", "strength"], default="uniform")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--exhaustive-limit", type=int, default=1_000_000)
+    args = parser.parse_args()
+    full_schedule, scores, _ = app.load_full_schedule()
+    start = time.perf_counter()
+    odds = qualification_odds(app.load_group_schedule(), scores, full_schedule, model=args.model,
+                              n_sims=args.sims, workers=args.workers, seed=args.seed,
+                              exhaustive_limit=args.exhaustive_limit)
+    print(odds.to_string(index=False, float_format=lambda p: f"{p:6.1%}"))
+    print(f"{odds.attrs['method']} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
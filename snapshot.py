@@ -0,0 +1,203 @@
+"""
+Static snapshot site of the tournaments, for offline viewing and plain static hosting.
+
+Renders the schedule, scores, standings and knockout brackets of every registered
+tournament into HTML pages, next to the same JSON documents the API serves:
+
+    site/index.html                                   links to every tournament
+    site/styles.css
+    site/<tournament>/index.html                      schedule
+    site/<tournament>/scores.html, standings.html, brackets.html
+    site/<tournament>/data/<schedule|scores|standings|brackets>.json
+
+Spectators can then be served by any static file server or CDN, leaving the Streamlit
+app to the admins. Exports are incremental: nothing is rebuilt while a tournament's data
+signature is unchanged, and otherwise a page is only re-rendered and rewritten when the
+document it shows changed (a group result touches the scores and standings pages; the
+brackets page only changes once the knockouts are drawn or played). Every file is
+replaced atomically, so the web server never serves a half-written page.
+
+    python snapshot.py [--out site] [--tournament main] [--watch 10] [--refresh 60]
+"""
+import argparse
+import contextlib
+import hashlib
+import html
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+import api
+import app as tournament
+
+# Page file -> (title, the API document it is rendered from)
+PAGES = {
+    "index.html": ("Schedule", "schedule"),
+    "scores.html": ("Scores", "scores"),
+    "standings.html": ("Standings", "standings"),
+    "brackets.html": ("Knockout Brackets", "brackets"),
+}
+MANIFEST_NAME = "manifest.json"
+
+
+def _write(file, data):
+    """Replace ``file`` with ``data`` (bytes) via a temp file and rename."""
+    directory = os.path.dirname(os.path.abspath(file))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".snapshot-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, file)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp)
+        raise
+
+
+def _write_if_changed(file, data):
+    """Write ``data`` unless ``file`` already holds exactly that; returns whether it wrote."""
+    try:
+        with open(file, "rb") as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    _write(file, data)
+    return True
+
+
+def _stylesheet():
+    """The app's stylesheet, read afresh so a watching export picks up edits."""
+    with open(tournament.STYLESHEET_FILE, "rb") as f:
+        return f.read()
+
+
+def _read_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _table(rows, columns=None):
+    return pd.DataFrame(rows, columns=columns).to_html(index=False, na_rep="", border=0, classes="snapshot-table")
+
+
+def render_body(name, document):
+    """HTML for one API document, using the app's bracket markup for the brackets."""
+    if name == "schedule":
+        return _table(document["matches"])
+    if name == "scores":
+        return _table(document["matches"], ["match", "teams", "score"])
+    if name == "standings":
+        return "".join(f"<h3>Group {html.escape(str(group))}</h3>"
+                       + _table(ranking, ["team", "code", "points", "wins", "losses", "gf", "ga"])
+                       for group, ranking in document.items())
+    if not document:
+        return "<p>Knockout brackets will be displayed once the group stage is complete.</p>"
+    return "".join(tournament.create_bracket_html(matches, f"{bracket} Knockout Bracket") for bracket, matches in document.items())
+
+
+def render_page(title, body, tournament_name, css_version, refresh):
+    nav = " | ".join(f'<a href="{file}">{page_title}</a>' for file, (page_title, _) in PAGES.items())
+    reload = f'<meta http-equiv="refresh" content="{refresh}">' if refresh else ""
+    name = html.escape(tournament_name)
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+{reload}
+<title>{title} - {name}</title>
+<link rel="stylesheet" href="../styles.css?v={css_version}">
+</head>
+<body>
+<h1 class="main-title">{name}</h1>
+<nav>{nav} | <a href="../index.html">All tournaments</a></nav>
+<h2 class="section-header">{title}</h2>
+{body}
+<p class="snapshot-updated">Updated {datetime.now():%Y-%m-%d %H:%M:%S}</p>
+</body>
+</html>
+""".encode()
+
+
+def export_tournament(out, tournament_id=None, refresh=60):
+    """
+    Bring ``out/<tournament>/`` up to date with the tournament's data; returns the
+    files written (empty when nothing changed since the last export).
+    """
+    tournament.use_tournament(tournament_id)
+    directory = os.path.join(out, tournament.TOURNAMENT_ID)
+    manifest = _read_manifest(directory)
+    signature = repr(tournament.tournament_signature())
+    css_version = hashlib.sha1(_stylesheet()).hexdigest()[:12]
+    layout = [refresh, css_version]  # a change re-renders every page
+    if manifest.get("signature") == signature and manifest.get("layout") == layout:
+        return []
+    previous = manifest.get("documents", {}) if manifest.get("layout") == layout else {}
+    documents, digests, written = api.build_documents(), {}, []
+    for name, document in documents.items():
+        data = json.dumps(document, separators=(",", ":")).encode()
+        digests[name] = hashlib.sha1(data).hexdigest()
+        file = os.path.join(directory, "data", f"{name}.json")
+        if previous.get(name) != digests[name] or not os.path.exists(file):
+            _write(file, data)
+            written.append(file)
+    tournament_name = tournament.tournament_config.get("name", tournament.TOURNAMENT_ID)
+    for page, (title, name) in PAGES.items():
+        file = os.path.join(directory, page)
+        if previous.get(name) != digests[name] or not os.path.exists(file):
+            _write(file, render_page(title, render_body(name, documents[name]), tournament_name, css_version, refresh))
+            written.append(file)
+    _write(os.path.join(directory, MANIFEST_NAME),
+           json.dumps({"signature": signature, "layout": layout, "documents": digests}).encode())
+    return written
+
+
+def export(out="site", tournament_ids=None, refresh=60):
+    """Export every registered tournament (or ``tournament_ids``) plus the shared index and stylesheet."""
+    tournament_ids = list(tournament.tournament_registry()) if tournament_ids is None else tournament_ids
+    written = []
+    if _write_if_changed(os.path.join(out, "styles.css"), _stylesheet()):
+        written.append(os.path.join(out, "styles.css"))
+    links = "".join(f'<li><a href="{html.escape(t)}/index.html">{html.escape(t)}</a></li>' for t in tournament_ids)
+    index = (f'<!DOCTYPE html>\n<html lang="en"><head><meta charset="utf-8"><title>Tournaments</title>'
+             f'<link rel="stylesheet" href="styles.css"></head><body><ul>{links}</ul></body></html>\n').encode()
+    if _write_if_changed(os.path.join(out, "index.html"), index):
+        written.append(os.path.join(out, "index.html"))
+    for tournament_id in tournament_ids:
+        written += export_tournament(out, tournament_id, refresh)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the tournaments as a static HTML/JSON site.")
+    parser.add_argument("--out", default="site", help="output directory (default: site)")
+    parser.add_argument("--tournament", action="append", metavar="ID",
+                        help="tournament to export; repeat for several (default: every registered one)")
+    parser.add_argument("--watch", type=float, default=0, metavar="SECONDS",
+                        help="keep running, re-exporting whatever changed every SECONDS")
+    parser.add_argument("--refresh", type=int, default=60, metavar="SECONDS",
+                        help="pages reload themselves this often in the browser (0: never)")
+    args = parser.parse_args()
+    while True:
+        start = time.perf_counter()
+        written = export(args.out, args.tournament, args.refresh)
+        if written:
+            print(f"{datetime.now():%H:%M:%S} wrote {len(written)} file(s) in "
+                  f"{(time.perf_counter() - start) * 1e3:.0f}ms: {', '.join(os.path.relpath(f, args.out) for f in written)}")
+        if not args.watch:
+            break
+        time.sleep(args.watch)
+
+
+if __name__ == "__main__":
+    main()
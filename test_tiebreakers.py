@@ -0,0 +1,97 @@
+"""Known tie scenarios for the tiebreaker rules (run with ``python -m pytest`` from this directory)."""
+import pandas as pd
+import pytest
+
+import app
+from model import TeamRecord
+from tiebreakers import Tiebreakers, seeded_order, validate_tiebreakers
+
+FIFA_TIEBREAKERS = ["points", "head_to_head", "goal_difference", "goals_for", "fair_play", "lots"]
+
+# (description, results as (home, away, score), fair play points, expected order under FIFA_TIEBREAKERS)
+TIE_SCENARIOS = [
+    ("three-way tie split by head-to-head goal difference, then head-to-head goals",
+     [("W", "X", "1-0"), ("X", "Y", "3-0"), ("Y", "W", "2-0"), ("W", "Z", "5-0"), ("X", "Z", "1-0"), ("Y", "Z", "1-0")],
+     {}, ["X", "Y", "W", "Z"]),
+    ("two teams level on points: head-to-head beats a better overall goal difference",
+     [("W", "X", "6-0"), ("W", "Y", "0-1"), ("W", "Z", "3-0"), ("X", "Y", "0-1"), ("X", "Z", "1-0"), ("Y", "Z", "0-1")],
+     {}, ["Y", "W", "X", "Z"]),
+    ("mini-league separates one team, then is re-run on the two it leaves level",
+     [("W", "X", "2-1"), ("Y", "W", "2-1"), ("X", "Y", "1-0"), ("W", "Z", "1-0"), ("X", "Z", "1-0"), ("Y", "Z", "4-0")],
+     {}, ["W", "X", "Y", "Z"]),
+    ("everyone level on results: fair play decides",
+     [("W", "X", "1-1"), ("Y", "Z", "1-1"), ("W", "Y", "0-0"), ("X", "Z", "0-0"), ("W", "Z", "2-2"), ("X", "Y", "2-2")],
+     {"W": 3, "X": 1}, ["Y", "Z", "X", "W"]),
+]
+
+
+def _group(results, fair_play, tiebreakers):
+    """A one-group tournament of teams W, X, Y, Z: (team list, config, group schedule, scores)."""
+    team_list = [{"code": c, "name": c, "group": "A", "fair_play": fair_play.get(c, 0)} for c in "WXYZ"]
+    config = {"teams": team_list, "tiebreakers": tiebreakers, "lots_seed": 0}
+    matches = range(1, len(results) + 1)
+    group_schedule = pd.DataFrame({"match": matches, "teams": [f"{a} vs {b}" for a, b, _ in results], "group": "A"})
+    scores = pd.DataFrame({"match": matches, "score": [score for _, _, score in results]})
+    return team_list, config, group_schedule, scores
+
+
+def _order(engine):
+    return [code for code, _ in engine.standings()["A"]]
+
+
+@pytest.mark.parametrize("description, results, fair_play, expected", TIE_SCENARIOS,
+                         ids=[scenario[0] for scenario in TIE_SCENARIOS])
+def test_known_scenarios(description, results, fair_play, expected):
+    team_list, config, group_schedule, scores = _group(results, fair_play, FIFA_TIEBREAKERS)
+    assert _order(app.StandingsEngine(group_schedule, team_list, config).load(scores)) == expected
+
+
+@pytest.mark.parametrize("description, results, fair_play, expected", TIE_SCENARIOS,
+                         ids=[scenario[0] for scenario in TIE_SCENARIOS])
+def test_scores_entered_one_by_one_rank_the_same(description, results, fair_play, expected):
+    team_list, config, group_schedule, scores = _group(results, fair_play, FIFA_TIEBREAKERS)
+    engine = app.StandingsEngine(group_schedule, team_list, config).load(scores.iloc[:0])
+    for match, score in zip(scores["match"], scores["score"]):
+        engine.set_score(match, "9-0")  # replaced below, so the head-to-head tables must reverse it
+        engine.set_score(match, score)
+    assert _order(engine) == expected
+
+
+def test_default_rules_ignore_head_to_head():
+    # Scenario 2 without head-to-head: goal difference puts W above Y, and Z above X
+    _, results, fair_play, _ = TIE_SCENARIOS[1]
+    team_list, config, group_schedule, scores = _group(results, fair_play, None)
+    assert _order(app.StandingsEngine(group_schedule, team_list, config).load(scores)) == ["W", "Y", "Z", "X"]
+
+
+def test_lots_are_drawn_the_same_way_every_time():
+    team_list = [{"code": c, "name": c, "group": "A"} for c in "WXYZ"]
+    records = {i: TeamRecord() for i in range(4)}
+    draws = [Tiebreakers(["points", "lots"], team_list, lots_seed=7).rank(range(4), records) for _ in range(2)]
+    assert draws[0] == draws[1]
+    assert sorted(draws[0]) == [0, 1, 2, 3]
+
+
+def test_unknown_or_repeated_criteria_are_rejected():
+    with pytest.raises(ValueError):
+        validate_tiebreakers(["points", "coin_toss"])
+    with pytest.raises(ValueError):
+        validate_tiebreakers(["points", "points"])
+
+
+def test_seeded_order_keeps_top_seeds_apart():
+    assert seeded_order(4) == [0, 3, 1, 2]
+    assert seeded_order(8) == [0, 7, 3, 4, 1, 6, 2, 5]
+
+
+def test_ranked_bracket_takes_the_best_thirds():
+    team_list = [{"code": f"{g}{i}", "name": f"{g}{i}", "group": g} for g in "ABCDEF" for i in range(1, 5)]
+    config = {"teams": team_list, "tiebreakers": app.DEFAULT_TIEBREAKERS, "lots_seed": 0}
+    thirds_points = {"A": 4, "B": 3, "C": 6, "D": 1, "E": 5, "F": 2}
+    standings = {
+        group: [(f"{group}{pos}", {"points": 9 - pos if pos != 3 else thirds_points[group],
+                                   "wins": 0, "losses": 0, "gf": 0, "ga": 0}) for pos in range(1, 5)]
+        for group in "ABCDEF"
+    }
+    seeds = app.bracket_seeds(standings, [3], "ranked", config, count=4)
+    assert seeds == ["C3", "B3", "E3", "A3"]  # best four thirds, 1st v 4th and 2nd v 3rd
@@ -0,0 +1,158 @@
+"""
+Group ranking with configurable tiebreakers.
+
+A tournament config lists its ranking rules in order under "tiebreakers"; the default
+is the original ranking by points, goal difference and goals scored. A FIFA/UEFA-style
+set of rules reads:
+
+    "tiebreakers": ["points", "head_to_head", "goal_difference", "goals_for", "fair_play", "lots"]
+
+Criteria (higher is better unless noted):
+    points, goal_difference, goals_for, wins   the team's overall group record
+    head_to_head   a mini-league of the matches among the teams still level: points,
+                   then goal difference, then goals scored in those matches only. When it
+                   splits the tie but leaves a smaller group of teams level, the mini-league
+                   is re-run on just those teams; when it separates nobody, ranking moves on
+                   to the next criterion.
+    fair_play      fewer disciplinary points ("fair_play" on the team in the config)
+    lots           a drawing of lots, seeded by the config's "lots_seed" so every process
+                   and every rerun draws the same order
+
+Teams level on every criterion keep their config order. Mini-league tables are built
+only for tied clusters, from pairwise result matrices that are updated with every
+result. Teams from different groups (e.g. the best third-placed teams) are ranked by
+the same rules; head-to-head never separates them, as they have not met.
+"""
+import hashlib
+
+CRITERIA = ("points", "goal_difference", "goals_for", "wins", "head_to_head", "fair_play", "lots")
+DEFAULT_TIEBREAKERS = ["points", "goal_difference", "goals_for"]
+
+
+def validate_tiebreakers(tiebreakers):
+    """Raise ValueError for an unknown or repeated criterion."""
+    unknown = [c for c in tiebreakers if c not in CRITERIA]
+    if unknown:
+        raise ValueError(f"Unknown tiebreaker {unknown[0]!r}; expected some of {', '.join(CRITERIA)}")
+    if len(set(tiebreakers)) != len(tiebreakers):
+        raise ValueError("Each tiebreaker can only be listed once")
+    return list(tiebreakers)
+
+
+def seeded_order(n):
+    """
+    Slot order for ``n`` ranked teams (a power of two, 0 = best) so that consecutive
+    pairs meet in the first round and the top seeds can only meet late: 1v8, 4v5, 2v7, 3v6.
+    """
+    order = [0]
+    while len(order) < n:
+        order = [seed for s in order for seed in (s, 2 * len(order) - 1 - s)]
+    return order
+
+
+class PairwiseResults:
+    """Points and goals each team of a group took off each other team, as k x k matrices."""
+
+    __slots__ = ("index", "points", "goals")
+
+    def __init__(self, team_ids):
+        self.index = {team: i for i, team in enumerate(team_ids)}
+        self.points = [[0] * len(team_ids) for _ in team_ids]
+        self.goals = [[0] * len(team_ids) for _ in team_ids]
+
+    def apply(self, home, away, result, sign=1):
+        """Add (``sign=1``) or remove (``sign=-1``) one result between two teams."""
+        i, j = self.index[home], self.index[away]
+        s1, s2 = result
+        self.goals[i][j] += sign * s1
+        self.goals[j][i] += sign * s2
+        if s1 > s2:
+            self.points[i][j] += sign * 3
+        elif s2 > s1:
+            self.points[j][i] += sign * 3
+        else:
+            self.points[i][j] += sign
+            self.points[j][i] += sign
+
+    def mini_league(self, team_ids):
+        """Team id -> (points, goal difference, goals for) over the matches among ``team_ids`` only."""
+        rows = [self.index[team] for team in team_ids]
+        table = {}
+        for team, i in zip(team_ids, rows):
+            points, goals = self.points[i], self.goals[i]
+            gf = sum(goals[j] for j in rows)
+            ga = sum(self.goals[j][i] for j in rows)
+            table[team] = (sum(points[j] for j in rows), gf - ga, gf)
+        return table
+
+
+def _clusters(team_ids, key):
+    """``team_ids`` sorted best first by ``key`` and split into runs of equal keys (stable)."""
+    ranked = sorted(team_ids, key=key, reverse=True)
+    clusters = [[ranked[0]]]
+    previous = key(ranked[0])
+    for team in ranked[1:]:
+        value = key(team)
+        if value == previous:
+            clusters[-1].append(team)
+        else:
+            clusters.append([team])
+            previous = value
+    return clusters
+
+
+class Tiebreakers:
+    """Ranks team ids by an ordered list of criteria (see the module docstring)."""
+
+    def __init__(self, criteria=None, team_list=(), lots_seed=0):
+        self.criteria = validate_tiebreakers(DEFAULT_TIEBREAKERS if criteria is None else criteria)
+        self.head_to_head = "head_to_head" in self.criteria
+        # Indexed by team id (position in ``team_list``); only built when the rule is in use
+        self.fair_play = [t.get("fair_play", 0) for t in team_list] if "fair_play" in self.criteria else []
+        self.lots = ([hashlib.sha1(f"{lots_seed}:{t['code']}".encode()).digest() for t in team_list]
+                     if "lots" in self.criteria else [])
+
+    @classmethod
+    def from_config(cls, config, team_list=None):
+        return cls(config.get("tiebreakers"), config["teams"] if team_list is None else team_list,
+                   config.get("lots_seed", 0))
+
+    def _key(self, criterion, records):
+        if criterion == "points":
+            return lambda t: records[t].points
+        if criterion == "goal_difference":
+            return lambda t: records[t].gf - records[t].ga
+        if criterion == "goals_for":
+            return lambda t: records[t].gf
+        if criterion == "wins":
+            return lambda t: records[t].wins
+        if criterion == "fair_play":
+            return lambda t: -self.fair_play[t]
+        return lambda t: self.lots[t]
+
+    def rank(self, team_ids, records, pairwise=None):
+        """
+        ``team_ids`` best first. ``records`` maps team id -> TeamRecord; ``pairwise`` is the
+        group's PairwiseResults (None across groups, where head-to-head does not apply).
+        """
+        team_ids = list(team_ids)
+        if not self.head_to_head or pairwise is None:
+            keys = [self._key(c, records) for c in self.criteria if c != "head_to_head"]
+            if not keys:
+                return team_ids
+            values = list(zip(*([key(t) for t in team_ids] for key in keys)))
+            return [team_ids[i] for i in sorted(range(len(team_ids)), key=values.__getitem__, reverse=True)]
+        return self._rank(team_ids, 0, records, pairwise)
+
+    def _rank(self, cluster, level, records, pairwise):
+        if len(cluster) < 2 or level == len(self.criteria):
+            return cluster
+        criterion = self.criteria[level]
+        key = pairwise.mini_league(cluster).__getitem__ if criterion == "head_to_head" else self._key(criterion, records)
+        ranked = []
+        for tied in _clusters(cluster, key):
+            if criterion == "head_to_head" and 1 < len(tied) < len(cluster):
+                ranked += self._rank(tied, level, records, pairwise)  # re-run the mini-league on the smaller tie
+            else:
+                ranked += self._rank(tied, level + 1, records, pairwise)
+        return ranked